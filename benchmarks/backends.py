@@ -0,0 +1,46 @@
+"""Compares the frame times of the render backends on the benchmark
+scenarios, headless, the renderer using SDL's software renderer.
+
+    python -m benchmarks.backends [-s SCENARIO ...] [-f FRAMES]
+"""
+import argparse
+import functools
+
+from benchmarks.run import run_frames
+from benchmarks.scenarios import SCENARIOS
+from pygui.backends import RendererBackend, SurfaceBackend
+from pygui.frame_scheduler import percentile
+
+# backends compared, by name
+BACKENDS = {
+    "surface": SurfaceBackend,
+    "renderer": functools.partial(RendererBackend, software=True),
+}
+
+# scenarios compared by default
+DEFAULT_SCENARIOS = ("buttons_1k", "labels_5k", "drags_100",
+                     "stacked_layers_8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-s", "--scenario", action="append",
+                        choices=sorted(SCENARIOS))
+    parser.add_argument("-f", "--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    for name in args.scenario or DEFAULT_SCENARIOS:
+        for backend_name, backend in BACKENDS.items():
+            frame_times, _ = run_frames(SCENARIOS[name], args.frames,
+                                        backend)
+            mean = sum(frame_times) / len(frame_times)
+            frame_times.sort()
+            print("{:<20} {:<10} mean {:7.2f} ms  p50 {:7.2f} ms"
+                  "  p99 {:7.2f} ms".format(
+                      name, backend_name, 1000 * mean,
+                      1000 * percentile(frame_times, 0.5),
+                      1000 * percentile(frame_times, 0.99)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Runs the benchmark scenarios headless and writes their results
+as JSON, optionally comparing them to previous results.
+
+    python -m benchmarks.run [-s SCENARIO ...] [-f FRAMES]
+                             [-o results.json] [-c baseline.json]
+"""
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+
+import pygame
+
+from benchmarks.scenarios import SCENARIOS
+from pygui.frame_scheduler import percentile
+from pygui.gui import GUI
+
+
+def run_frames(scenario, frames, backend=None):
+    """builds a scenario and runs frames, returns the frame
+    durations and the number of events delivered"""
+
+    g_u_i = GUI("benchmark", (1280, 720), 60, 1, headless=True,
+                backend=backend)
+    g_u_i.set_font(None, 16)
+    events_for_frame = scenario(g_u_i)
+    g_u_i.to_draw_all()
+
+    frame_times = []
+    event_count = 0
+    for frame in range(frames):
+        events = events_for_frame(frame)
+        start = time.perf_counter()
+        g_u_i.step(1, events)
+        frame_times.append(time.perf_counter() - start)
+        event_count += len(events)
+
+    if g_u_i.settings_store is not None:
+        g_u_i.settings_store.close(g_u_i.settings)
+    return frame_times, event_count
+
+
+def run_scenario(scenario, frames):
+    """returns the frame time distribution, event rate
+    and peak memory of a scenario"""
+
+    frame_times, event_count = run_frames(scenario, frames)
+
+    # memory is traced in a separate shorter run to keep timings exact
+    tracemalloc.start()
+    run_frames(scenario, min(frames, 10))
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    total_time = sum(frame_times)
+    frame_times.sort()
+    return {
+        "frames": frames,
+        "frame_time_mean": total_time / frames,
+        "frame_time_p50": percentile(frame_times, 0.5),
+        "frame_time_p90": percentile(frame_times, 0.9),
+        "frame_time_p99": percentile(frame_times, 0.99),
+        "frame_time_max": frame_times[-1],
+        "events_per_second": event_count / total_time,
+        "peak_memory_bytes": peak_memory
+    }
+
+
+def compare(results, baseline):
+    """prints the change of mean frame time against a baseline"""
+
+    for name, result in results.items():
+        if name in baseline["scenarios"]:
+            before = baseline["scenarios"][name]["frame_time_mean"]
+            after = result["frame_time_mean"]
+            print("{:<24} {:+7.1f}%".format(
+                name, 100 * (after - before) / before))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-s", "--scenario", action="append",
+                        choices=sorted(SCENARIOS))
+    parser.add_argument("-f", "--frames", type=int, default=200)
+    parser.add_argument("-o", "--output", default="bench_results.json")
+    parser.add_argument("-c", "--compare")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.scenario or SCENARIOS:
+        result = run_scenario(SCENARIOS[name], args.frames)
+        results[name] = result
+        print("{:<24} p50 {:7.2f} ms  p99 {:7.2f} ms  {:10.0f} events/s"
+              "  peak {:6.1f} MB".format(
+                  name, 1000 * result["frame_time_p50"],
+                  1000 * result["frame_time_p99"],
+                  result["events_per_second"],
+                  result["peak_memory_bytes"] / 2 ** 20))
+
+    with open(args.output, "w") as file:
+        json.dump({
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "scenarios": results
+        }, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r") as file:
+            compare(results, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
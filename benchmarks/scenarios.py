@@ -0,0 +1,183 @@
+import os
+import tempfile
+
+import pygame
+
+from pygui import layer
+
+
+def motion(pos):
+    """mouse motion event to a position"""
+
+    return pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0),
+                              buttons=(0, 0, 0))
+
+
+def click(pos, button=1):
+    """mouse button down and up events at a position"""
+
+    return [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos,
+                               button=button),
+            pygame.event.Event(pygame.MOUSEBUTTONUP, pos=pos,
+                               button=button)]
+
+
+def grid_positions(g_u_i, count, spacing):
+    """positions of objects laid out in rows across the window"""
+
+    columns = max(1, g_u_i.size[0] // spacing[0])
+    return [(spacing[0] // 2 + (i % columns) * spacing[0],
+             spacing[1] // 2 + ((i // columns) * spacing[1]
+                                % g_u_i.size[1])) for i in range(count)]
+
+
+def sweep(g_u_i, frame):
+    """cursor position sweeping the window diagonally"""
+
+    width, height = g_u_i.size
+    return (frame * 7 % width, frame * 5 % height)
+
+
+def buttons(count):
+    """buttons laid out on one layer, hovered by a moving cursor"""
+
+    def build(g_u_i):
+        main = layer.Layer(g_u_i, g_u_i.size)
+        g_u_i.add_layer("main", main)
+        for i, pos in enumerate(grid_positions(g_u_i, count, (24, 20))):
+            main.layer_objects[i] = layer.Button(
+                main, (200, 0, 0), pos, 6, str(i))
+
+        def events(frame):
+            return [motion(sweep(g_u_i, frame))]
+
+        return events
+
+    return build
+
+
+def motion_storm(count, events_per_frame):
+    """buttons receiving a flood of mouse motion events"""
+
+    def build(g_u_i):
+        events_for_frame = buttons(count)(g_u_i)
+
+        def events(frame):
+            storm = []
+            for i in range(events_per_frame):
+                storm.extend(events_for_frame(frame * events_per_frame + i))
+            return storm
+
+        return events
+
+    return build
+
+
+def labels(count):
+    """text-heavy layer of labels redrawn entirely each frame"""
+
+    def build(g_u_i):
+        main = layer.Layer(g_u_i, g_u_i.size)
+        g_u_i.add_layer("main", main)
+        for i, pos in enumerate(grid_positions(g_u_i, count, (80, 16))):
+            main.layer_objects[i] = layer.Label(
+                main, "label " + str(i), (255, 255, 255), pos)
+
+        def events(frame):
+            main.to_draw = True
+            return [motion(sweep(g_u_i, frame))]
+
+        return events
+
+    return build
+
+
+def drags(count):
+    """drag and drop objects dragged together by the cursor"""
+
+    def build(g_u_i):
+        main = layer.Layer(g_u_i, g_u_i.size)
+        g_u_i.add_layer("main", main)
+        positions = grid_positions(g_u_i, count, (40, 40))
+        for i, pos in enumerate(positions):
+            main.layer_objects[i] = layer.DragAndDrop(
+                main, (0, 200, 0), pos, 10, str(i))
+
+        # start dragging every object at once
+        for drag in main.layer_objects.values():
+            drag.dragged = True
+            drag.initial_cur_pos = (0, 0)
+            drag.initial_pos = drag.pos
+            main.track(drag)
+
+        def events(frame):
+            return [motion((frame % 50, frame % 30))]
+
+        return events
+
+    return build
+
+
+def setting_toggles(count, clicks_per_frame):
+    """grid of setting toggle buttons, some clicked each frame"""
+
+    def build(g_u_i):
+        settings_file_name = os.path.join(tempfile.mkdtemp(),
+                                          "settings.json")
+        g_u_i.load_settings(settings_file_name, {})
+        main = layer.Layer(g_u_i, g_u_i.size)
+        g_u_i.add_layer("main", main)
+        positions = grid_positions(g_u_i, count, (24, 20))
+        for i, pos in enumerate(positions):
+            main.layer_objects[i] = layer.SettingToggleButton(
+                main, (0, 0, 200), pos, 6, str(i), "toggle " + str(i))
+
+        def events(frame):
+            clicks = []
+            for i in range(clicks_per_frame):
+                pos = positions[(frame * clicks_per_frame + i) % count]
+                clicks.extend(click(pos))
+            return clicks
+
+        return events
+
+    return build
+
+
+def stacked_layers(count):
+    """full-window layers stacked on each other, the top one
+    moving across the window over buttons being hovered"""
+
+    def build(g_u_i):
+        for i in range(count):
+            stacked = layer.Layer(g_u_i, g_u_i.size)
+            g_u_i.add_layer("layer " + str(i), stacked)
+            positions = grid_positions(g_u_i, 50, (120, 60))
+            for j, pos in enumerate(positions):
+                stacked.layer_objects[j] = layer.Button(
+                    stacked, (200, 0, 50 * i % 256), pos, 8, str(j))
+        panel = layer.Layer(g_u_i, (200, 150))
+        g_u_i.add_layer("panel", panel)
+        panel.layer_objects[0] = layer.Label(
+            panel, "panel", (255, 255, 255), (10, 10))
+
+        def events(frame):
+            panel.move(sweep(g_u_i, frame))
+            return [motion(sweep(g_u_i, 3 * frame))]
+
+        return events
+
+    return build
+
+
+# scenario builders by name
+SCENARIOS = {
+    "buttons_10": buttons(10),
+    "buttons_1k": buttons(1000),
+    "buttons_10k": buttons(10000),
+    "motion_storm_1k": motion_storm(1000, 200),
+    "labels_5k": labels(5000),
+    "drags_100": drags(100),
+    "setting_toggles_1k": setting_toggles(1000, 5),
+    "stacked_layers_8": stacked_layers(8),
+}
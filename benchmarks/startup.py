@@ -0,0 +1,71 @@
+"""Measures the time from process start to the first displayed frame,
+with the font cache cold (removed before each run) and warm.
+
+    python benchmarks/startup.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def first_frame():
+    """starts a dashboard, draws its first frame
+    and prints the wall-clock time"""
+
+    from pygui.gui import GUI
+    from pygui import layer
+    import pygame
+
+    g_u_i = GUI("startup", (800, 600), 60, 1)
+    g_u_i.set_font("arial", 16)
+    main = layer.Layer(g_u_i, g_u_i.size)
+    g_u_i.add_layer("main", main)
+    for i in range(20):
+        main.layer_objects[i] = layer.Button(
+            main, (200, 0, 0), (30, 30 + 25 * i), 8, "button " + str(i))
+
+    main.to_draw = True
+    main.update()
+    g_u_i.screen.blit(main.surface, (0, 0))
+    pygame.display.update()
+    print(time.time())
+
+
+def run(font_cache, cold):
+    """returns the startup time of a child process"""
+
+    if cold and os.path.exists(font_cache):
+        os.remove(font_cache)
+
+    env = dict(os.environ, PYGUI_FONT_CACHE=font_cache,
+               SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy",
+               PYGAME_HIDE_SUPPORT_PROMPT="1")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(
+        [root] + [path for path in [env.get("PYTHONPATH")] if path])
+
+    start = time.time()
+    output = subprocess.check_output(
+        [sys.executable, __file__, "--child"], env=env, text=True)
+    return float(output.split()[-1]) - start
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    font_cache = os.path.join(tempfile.mkdtemp(), "fonts.json")
+
+    for name, cold in (("cold font cache", True),
+                       ("warm font cache", False)):
+        times = [run(font_cache, cold) for _ in range(runs)]
+        print("{}: median {:.1f} ms, min {:.1f} ms over {} runs".format(
+            name, 1000 * statistics.median(times), 1000 * min(times), runs))
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        first_frame()
+    else:
+        main()
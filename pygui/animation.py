@@ -0,0 +1,112 @@
+import time
+
+
+def linear(progress):
+    """constant speed easing"""
+
+    return progress
+
+
+def ease_out(progress):
+    """decelerating easing"""
+
+    return 1 - (1 - progress) ** 2
+
+
+class Animation:
+    """interpolation of an attribute of an object over time"""
+
+    __slots__ = ("obj", "attribute", "start", "end", "start_time",
+                 "duration", "easing", "on_done")
+
+    def __init__(self, obj, attribute, start, end, start_time,
+                 duration, easing, on_done):
+        self.obj = obj
+        self.attribute = attribute
+        self.start = start
+        self.end = end
+        self.start_time = start_time
+        self.duration = duration
+        self.easing = easing
+        self.on_done = on_done
+
+    def progress(self, now):
+        """fraction of the animation done at a time"""
+
+        if self.duration <= 0:
+            return 1
+        return min(1, max(0, (now - self.start_time) / self.duration))
+
+    def value(self, progress):
+        """interpolated value at a fraction of the animation"""
+
+        eased = self.easing(progress)
+        if isinstance(self.start, tuple):
+            return tuple(start + (end - start) * eased
+                         for start, end in zip(self.start, self.end))
+        return self.start + (self.end - self.start) * eased
+
+
+class Animator:
+    """runs the active animations on wall-clock time, changing
+    their objects' attributes and requesting their redraw"""
+
+    def __init__(self, clock=time.monotonic):
+
+        # returns the current time in seconds
+        self.clock = clock
+
+        # active animations by object and attribute
+        self.animations = {}
+
+    def animate(self, obj, attribute, end, duration, start=None,
+                easing=linear, on_done=None):
+        """animates an attribute of an object from its current
+        or a start value to an end value in a duration, replacing
+        any animation of the same attribute"""
+
+        if start is None:
+            start = getattr(obj, attribute)
+        else:
+            setattr(obj, attribute, start)
+        self.animations[(obj, attribute)] = Animation(
+            obj, attribute, start, end, self.clock(), duration,
+            easing, on_done)
+
+    def cancel(self, obj, attribute):
+        """stops an animation where it is"""
+
+        self.animations.pop((obj, attribute), None)
+
+    def is_animating(self, obj, attribute):
+        """whether an attribute of an object is being animated"""
+
+        return (obj, attribute) in self.animations
+
+    def active(self):
+        """whether some animation is running"""
+
+        return bool(self.animations)
+
+    def tick(self):
+        """moves the active animations to the current time"""
+
+        if not self.animations:
+            return
+
+        now = self.clock()
+        for key, animation in list(self.animations.items()):
+            progress = animation.progress(now)
+            obj = animation.obj
+            setattr(obj, animation.attribute, animation.value(progress))
+
+            # only the animated object is redrawn
+            invalidate = getattr(obj, "invalidate", None)
+            if invalidate is not None:
+                invalidate()
+
+            if progress >= 1:
+                if self.animations.get(key) is animation:
+                    del self.animations[key]
+                if animation.on_done is not None:
+                    animation.on_done()
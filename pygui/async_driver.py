@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import time
+
+import pygame
+
+from pygui.input_manager import frame
+
+
+async def awaited(awaitable):
+    """coroutine returning the result of an awaitable"""
+
+    return await awaitable
+
+
+def activate(g_u_i):
+    """runs the interaction loop on a new asyncio event
+    loop until the window is closed"""
+
+    asyncio.run(run(g_u_i))
+
+
+async def run(g_u_i):
+    """runs the interaction loop as a task of the running event
+    loop, coroutine actions running on the same loop between
+    frames, without any thread"""
+
+    try:
+        scheduler = g_u_i.scheduler
+        scheduler.set_fps(g_u_i.fps)
+
+        # actions and changes now run on this loop and thread
+        g_u_i.async_loop = asyncio.get_running_loop()
+        g_u_i.ui_thread = threading.current_thread()
+        g_u_i.to_draw_all()
+
+        # pygame cannot wait for events without blocking the
+        # event loop, so idle windows poll them once per frame
+        poll_period = 1 / g_u_i.fps
+
+        # when the event queue was last emptied, the events having
+        # waited in it since then at most
+        drained = time.monotonic()
+
+        while not g_u_i.stopping.is_set():
+
+            # when nothing changes, only run a frame once an event
+            # comes, a layer's regular redraw is due or an action
+            # submitted a change
+            if g_u_i.is_idle():
+                await asyncio.sleep(min(poll_period,
+                                        g_u_i.idle_wait_time()))
+                events = pygame.event.get()
+                input_time, drained = drained, time.monotonic()
+                if (not events and g_u_i.is_idle()
+                        and g_u_i.idle_wait_time() > 0):
+                    continue
+                scheduler.wake()
+                render = True
+
+            # otherwise wait for the next frame deadline, letting
+            # the actions run meanwhile
+            else:
+                delay, render = scheduler.next_frame()
+                await asyncio.sleep(max(0, delay))
+                scheduler.start_frame()
+                events = pygame.event.get()
+                input_time, drained = drained, time.monotonic()
+
+            # if the window is being closed, stop the loop
+            if not frame(g_u_i, events, render, input_time=input_time):
+                g_u_i.stopping.set()
+                return
+
+            scheduler.end_frame()
+    except pygame.error:
+        pass
@@ -0,0 +1,136 @@
+import weakref
+
+import pygame
+from pygame._sdl2 import video
+
+from pygui.colors import BLACK
+from pygui.profiler import span
+
+# SDL blend mode mixing textures by their alpha
+BLEND_MODE = 1
+
+
+def composite(screen, layer, rect):
+    """blits the part of a layer inside a window rect"""
+
+    area = rect.clip(layer.rect())
+    if area.width and area.height:
+        screen.blit(layer.front_surface(), area,
+                    area.move(-layer.pos[0], -layer.pos[1]))
+
+
+def covering_layer(layers, rect):
+    """index of the top opaque layer covering a window
+    rect, or None if there is none"""
+
+    for index in range(len(layers) - 1, -1, -1):
+        layer = layers[index]
+        if layer.opaque and layer.rect().contains(rect):
+            return index
+    return None
+
+
+class SurfaceBackend:
+    """composites the layers on the window's surface with blits,
+    only in the changed regions of the window"""
+
+    def __init__(self, g_u_i):
+
+        # store reference to GUI window
+        self.g_u_i = g_u_i
+
+        # open the window and get its surface
+        pygame.display.set_caption(g_u_i.name)
+        self.screen = pygame.display.set_mode(g_u_i.size)
+
+    def present(self, changes, rects):
+        """recomposes the layers in rects of the window and
+        updates them on the display, changes listing the layers
+        redrawn with their changed rects"""
+
+        layers = [self.g_u_i.layers[layer_key]
+                  for layer_key in self.g_u_i.visible_layers()]
+        for rect in rects:
+
+            # start from the top opaque layer covering the rect
+            first = covering_layer(layers, rect)
+            if first is None:
+                first = 0
+                self.screen.fill(BLACK, rect)
+            for layer in layers[first:]:
+                composite(self.screen, layer, rect)
+
+        # update the window display
+        with span(self.g_u_i, "display update"):
+            pygame.display.update(rects)
+
+    def snapshot(self):
+        """copy of the window's content"""
+
+        return self.screen.copy()
+
+
+class RendererBackend:
+    """composites the layers as textures with an SDL renderer,
+    in software or on the GPU, each layer being uploaded once
+    and then only in the regions it redraws"""
+
+    def __init__(self, g_u_i, software=False):
+
+        # store reference to GUI window
+        self.g_u_i = g_u_i
+
+        """the window is opened without the display module's
+        surface, which SDL does not allow alongside a renderer"""
+        self.screen = None
+        self.window = video.Window(g_u_i.name, g_u_i.size)
+        self.renderer = video.Renderer(self.window,
+                                       accelerated=0 if software else -1)
+        self.renderer.draw_color = BLACK + (255,)
+
+        # texture of each layer
+        self.textures = weakref.WeakKeyDictionary()
+
+    def texture(self, layer):
+        """texture of a layer, uploaded entirely when created,
+        returns it and whether it was created"""
+
+        surface = layer.front_surface()
+        texture = self.textures.get(layer)
+        if texture is not None and (texture.width, texture.height) \
+                == surface.get_size():
+            return texture, False
+
+        texture = video.Texture(self.renderer, surface.get_size(),
+                                streaming=True)
+        if not layer.opaque:
+            texture.blend_mode = BLEND_MODE
+        texture.update(surface)
+        self.textures[layer] = texture
+        return texture, True
+
+    def present(self, changes, rects):
+        """uploads the changed rects of the redrawn layers, then
+        draws the layers' textures and shows the frame"""
+
+        for layer, layer_rects in changes:
+            texture, created = self.texture(layer)
+            if created:
+                continue
+            surface = layer.front_surface()
+            for rect in layer_rects:
+                texture.update(surface.subsurface(rect), rect)
+
+        # the renderer shows whole frames
+        if rects:
+            self.renderer.clear()
+            for layer_key in self.g_u_i.visible_layers():
+                layer = self.g_u_i.layers[layer_key]
+                self.texture(layer)[0].draw(dstrect=layer.rect())
+            with span(self.g_u_i, "display update"):
+                self.renderer.present()
+
+    def snapshot(self):
+        """copy of the window's content"""
+
+        return self.renderer.to_surface()
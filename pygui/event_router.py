@@ -0,0 +1,81 @@
+import pygame
+
+from pygui.layer import object_event
+
+# pointer events sent to the object capturing the pointer
+CAPTURED_EVENTS = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONUP)
+
+# mouse buttons clicking, the left, middle and right ones
+CLICK_BUTTONS = (1, 2, 3)
+
+
+class EventRouter:
+    """routes window events to the handlers and layers that
+    react to their type, from the top layer down, until
+    one of them consumes the event"""
+
+    def __init__(self, g_u_i):
+
+        # store reference to GUI window
+        self.g_u_i = g_u_i
+
+        # application handlers by event type, called before layers
+        self.handlers = {}
+
+    def subscribe(self, event_type, handler):
+        """registers a handler(cur_pos, event) for an event type,
+        returning True from it consumes the event"""
+
+        self.handlers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, event_type, handler):
+        """removes a handler of an event type"""
+
+        self.handlers[event_type].remove(handler)
+        if not self.handlers[event_type]:
+            del self.handlers[event_type]
+
+    def dispatch(self, cur_pos, event):
+        """transfers an event to its subscribers, returns
+        whether it was consumed"""
+
+        # cursor position of the event, computed once for all
+        cur_pos = getattr(event, "pos", cur_pos)
+
+        # clicks outside the focused object take the keyboard focus
+        # from it, which an object under the cursor may then take,
+        # the mouse wheel's buttons 4 and 5 not clicking
+        focus = self.g_u_i.focus
+        if (event.type == pygame.MOUSEBUTTONDOWN and focus is not None
+                and event.button in CLICK_BUTTONS):
+            bounds = focus.bounds()
+            if (bounds is None or not bounds.collidepoint(
+                    focus.layer.to_local(cur_pos))):
+                self.g_u_i.set_focus(None)
+
+        for handler in self.handlers.get(event.type, ()):
+            if handler(cur_pos, event):
+                return True
+
+        # motion and releases go straight to the capturing object
+        capture = self.g_u_i.capture
+        if capture is not None and event.type in CAPTURED_EVENTS:
+            layer = capture.layer
+            object_event(capture, event, layer.to_local(cur_pos))
+            layer.track(capture)
+            return True
+
+        layers = self.g_u_i.layers
+        for layer_key in reversed(self.g_u_i.visible_layers()):
+            layer = layers[layer_key]
+            if not layer.handles(event.type):
+                continue
+
+            # clicks outside a layer do not concern it
+            if (event.type == pygame.MOUSEBUTTONDOWN
+                    and not layer.rect().collidepoint(cur_pos)):
+                continue
+
+            if layer.event(cur_pos, event):
+                return True
+        return False
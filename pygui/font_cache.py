@@ -0,0 +1,79 @@
+import json
+import os
+
+import pygame
+
+
+def default_cache_file_name():
+    """file storing the resolved font paths, in the user's
+    cache directory unless set by PYGUI_FONT_CACHE"""
+
+    file_name = os.environ.get("PYGUI_FONT_CACHE")
+    if file_name is None:
+        cache_dir = os.environ.get("XDG_CACHE_HOME",
+                                   os.path.expanduser("~/.cache"))
+        file_name = os.path.join(cache_dir, "pygui", "fonts.json")
+    return file_name
+
+
+class FontCache:
+    """persistent mapping from font names to font files, such
+    that system font directories are only scanned once"""
+
+    def __init__(self, file_name=None):
+
+        if file_name is None:
+            file_name = default_cache_file_name()
+        self.file_name = file_name
+
+        # resolved font paths by font name, loaded when first needed
+        self.paths = None
+
+    def load(self):
+        """loads the resolved font paths from disk"""
+
+        self.paths = {}
+        try:
+            with open(self.file_name, "r") as file:
+                self.paths = json.load(file)
+        except (OSError, ValueError):
+            pass
+
+    def save(self):
+        """saves the resolved font paths to disk"""
+
+        try:
+            os.makedirs(os.path.dirname(self.file_name), exist_ok=True)
+            temp_file_name = self.file_name + ".tmp"
+            with open(temp_file_name, "w") as file:
+                json.dump(self.paths, file)
+            os.replace(temp_file_name, self.file_name)
+        except OSError:
+            pass
+
+    def resolve(self, font_type):
+        """returns the file of a font, or None if not found"""
+
+        if font_type is None:
+            return None
+        if self.paths is None:
+            self.load()
+
+        # use the cached path if its file still exists
+        key = font_type.lower()
+        if key in self.paths:
+            path = self.paths[key]
+            if path is None or os.path.exists(path):
+                return path
+
+        # scan the system fonts and remember the result
+        path = pygame.font.match_font(font_type)
+        self.paths[key] = path
+        self.save()
+        return path
+
+    def font(self, font_type, font_size):
+        """returns a font of a size, the default font
+        being used if it is not found"""
+
+        return pygame.font.Font(self.resolve(font_type), font_size)
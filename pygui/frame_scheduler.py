@@ -0,0 +1,134 @@
+from collections import deque
+import time
+
+
+def percentile(sorted_values, fraction):
+    """value under which a fraction of sorted values fall"""
+
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class FrameScheduler:
+    """paces frames on absolute monotonic deadlines, skipping
+    renders to catch up when running late, and keeps rolling
+    frame time statistics"""
+
+    def __init__(self, fps, max_skipped=5, window=300):
+
+        # time between two frame deadlines
+        self.period = 1 / fps
+
+        # frames late by more than this many periods resynchronize
+        self.max_skipped = max_skipped
+
+        # deadline of the current frame and start of its work
+        self.deadline = None
+        self.frame_start = None
+
+        # durations of the last frames' work
+        self.frame_times = deque(maxlen=window)
+
+        # times from taking the last inputs to showing them
+        self.latencies = deque(maxlen=window)
+
+        # frame counters
+        self.frames = 0
+        self.missed = 0
+        self.skipped = 0
+
+    def set_fps(self, fps):
+        """changes the frame rate"""
+
+        self.period = 1 / fps
+
+    def begin_frame(self):
+        """sleeps until the next frame deadline and returns
+        whether the frame should be rendered"""
+
+        delay, render = self.next_frame()
+        if delay > 0:
+            time.sleep(delay)
+        self.start_frame()
+        return render
+
+    def next_frame(self):
+        """moves to the next frame deadline and returns the time
+        left until it and whether the frame should be rendered,
+        for loops that wait by themselves"""
+
+        now = time.monotonic()
+        if self.deadline is None:
+            self.deadline = now
+        else:
+            self.deadline += self.period
+
+        # when on time, the deadline is waited for by the caller
+        delay = self.deadline - now
+        render = True
+
+        # too late, resynchronize instead of catching up
+        if -delay > self.max_skipped * self.period:
+            self.missed += 1
+            self.deadline = now
+
+        # late by more than a frame, only process input
+        elif -delay > self.period:
+            self.missed += 1
+            self.skipped += 1
+            render = False
+
+        # slightly late, render without waiting
+        elif delay < 0:
+            self.missed += 1
+
+        return delay, render
+
+    def start_frame(self):
+        """marks the start of the current frame's work"""
+
+        self.frame_start = time.monotonic()
+
+    def wake(self):
+        """restarts the pacing after the loop waited idle"""
+
+        self.deadline = time.monotonic()
+        self.frame_start = self.deadline
+
+    def end_frame(self):
+        """records the duration of the current frame's work"""
+
+        self.record_frame(time.monotonic() - self.frame_start)
+
+    def record_frame(self, duration):
+        """records the duration of a frame's work"""
+
+        self.frames += 1
+        self.frame_times.append(duration)
+
+    def record_latency(self, latency):
+        """records the time from taking an input to
+        updating the display after it"""
+
+        self.latencies.append(latency)
+
+    def stats(self):
+        """returns frame counters and percentiles in
+        seconds of the last frames' durations"""
+
+        frame_times = sorted(self.frame_times)
+        latencies = sorted(self.latencies)
+        return {
+            "frames": self.frames,
+            "missed": self.missed,
+            "skipped": self.skipped,
+            "p50": percentile(frame_times, 0.5),
+            "p90": percentile(frame_times, 0.9),
+            "p99": percentile(frame_times, 0.99),
+            "max": frame_times[-1] if frame_times else 0.0,
+            "latency_p50": percentile(latencies, 0.5),
+            "latency_p99": percentile(latencies, 0.99),
+            "latency_max": latencies[-1] if latencies else 0.0
+        }
@@ -1,48 +1,150 @@
 import pygame
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import os
-import json
+import queue
+import threading
+import time
+import traceback
+
+from pygui.async_driver import awaited
+from pygui.backends import SurfaceBackend
+from pygui.event_router import EventRouter
+from pygui import input_manager
+from pygui.animation import Animator
+from pygui.font_cache import FontCache
+from pygui.frame_scheduler import FrameScheduler
+from pygui.profiler import Profiler
+from pygui.recorder import Recorder
+from pygui.settings_store import SettingsStore
+from pygui.sprite_cache import SpriteCache
+from pygui.text_cache import TextCache
 
 
 class GUI:
     """Handles the dashboard display"""
 
-    def __init__(self, name, size, fps, rus):
+    def __init__(self, name, size, fps, rus, headless=False, backend=None):
+
+        """without window in headless mode, the cursor
+        following the pointer events given to step"""
+        self.headless = headless
+        self.cursor = (0, 0)
+        if headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
 
-        # dashboard initialization
-        pygame.init()
-        pygame.display.set_caption(name)
+        # dashboard initialization, with only the display
+        # module, the font module being started by set_font
+        pygame.display.init()
+        self.name = name
         self.size = size
-        self.screen = pygame.display.set_mode(self.size)
 
-        # frames per second and regular updates per second
+        """composites the layers on the window, with blits on
+        its surface by default (backends.SurfaceBackend), screen
+        being None for backends that do not use it"""
+        if backend is None:
+            backend = SurfaceBackend
+        self.backend = backend(self)
+        self.screen = self.backend.screen
+
+        """frames per second and regular updates per second, the
+        latter being kept for compatibility as regular redraws
+        are now requested per layer with its refresh rate"""
         self.fps = fps
         self.rus = rus
 
+        """longest time the loop waits for events while nothing
+        changes, and event set to stop the loop"""
+        self.idle_timeout = 0.5
+        self.stopping = threading.Event()
+        self.loop_thread = None
+
+        # paces the frames of the interaction loop
+        self.scheduler = FrameScheduler(fps)
+
+        # times the frame phases when profiling is enabled
+        self.profiler = None
+
+        # logs the input of each frame when recording
+        self.recorder = None
+
+        # time of the current frame, virtual when stepping,
+        # which drives the animations
+        self.frame_time = time.monotonic()
+        self.animator = Animator(lambda: self.frame_time)
+
         # window layers
         self.layers = {}
         self.layers_order = []
 
+        """names of the shown layers, computed once for the steps
+        of a frame, None between frames and after layers are added,
+        moved, hidden or shown, as layers may also be removed and
+        reordered by editing layers and layers_order"""
+        self.visible = None
+
+        # window regions to recompose, such as those left by moved layers
+        self.screen_dirty = []
+
+        # routes window events to the layers
+        self.router = EventRouter(self)
+
+        # object receiving the keyboard input, if any
+        self.focus = None
+
+        # object receiving the pointer's motion and release, if any
+        self.capture = None
+
         # default font type and size
         self.font_size = None
         self.font_type = None
         self.font = None
         self.font_u = None
 
+        # font files found on previous launches
+        self.font_cache = FontCache()
+
+        # rendered text surfaces shared by layer objects
+        self.text_cache = TextCache()
+
+        # pre-rendered sprites shared by layer objects
+        self.sprite_cache = SpriteCache()
+
+        # changes submitted by other threads, applied by the
+        # interaction loop's thread at the start of each frame
+        self.pending = queue.SimpleQueue()
+        self.ui_thread = None
+
+        """asyncio event loop running the coroutine actions, the
+        asyncio driver's or one started in a thread when needed"""
+        self.async_loop = None
+        self.actions_thread = None
+
+        # worker threads drawing the layers rendered in the background
+        self.render_workers = None
+
         # stored settings
         self.settings = {}
         self.settings_file_name = None
 
-    def load_settings(self, settings_file_name, default_settings):
+        # saves changed settings in the background
+        self.settings_store = None
+
+    def load_settings(self, settings_file_name, default_settings,
+                      journal=True):
+        """loads or creates display settings, replaying the
+        journal of changes saved since the last complete write"""
 
-        # load or create display settings
         self.settings_file_name = settings_file_name
-        if os.path.exists(settings_file_name):
-            with open(settings_file_name, "r") as file:
-                self.settings = json.load(file)
-        else:
-            with open(settings_file_name, "w") as file:
-                json.dump(default_settings, file)
-                self.settings = default_settings
+        self.settings_store = SettingsStore(settings_file_name,
+                                            journal=journal)
+        self.settings = self.settings_store.load(default_settings)
+
+    def setting_changed(self, setting):
+        """requests a changed setting to be saved"""
+
+        if self.settings_store is not None:
+            self.settings_store.mark_dirty(setting, self.settings[setting])
 
     def set_font(self, font_type, font_size):
         """sets the font type and size"""
@@ -51,20 +153,316 @@ class GUI:
         pygame.font.init()
         self.font_size = font_size
         self.font_type = font_type
-        SF = pygame.font.SysFont
+        SF = self.font_cache.font
         self.font = SF(self.font_type, self.font_size)
         self.font_u = SF(self.font_type, self.font_size)
         self.font_u.set_underline(True)
 
+        # text rendered with the previous fonts is outdated
+        self.text_cache.clear()
+        self.sprite_cache.clear()
+
+    def cursor_pos(self, events=()):
+        """cursor position at the start of a frame, following
+        the frame's pointer events in headless mode"""
+
+        if not self.headless:
+            return pygame.mouse.get_pos()
+
+        for event in events:
+            if hasattr(event, "pos"):
+                self.cursor = event.pos
+        return self.cursor
+
+    def step(self, n_frames=1, events=()):
+        """runs frames synchronously, without threads or waiting,
+        the events being given in the first frame, returns
+        False once the window is closed, time advancing by
+        one frame period per frame"""
+
+        for i in range(n_frames):
+            start = time.perf_counter()
+            frame_events = list(events) if i == 0 else []
+            now = self.frame_time + 1 / self.fps
+            if not input_manager.frame(self, frame_events, now=now):
+                return False
+            self.scheduler.record_frame(time.perf_counter() - start)
+        return True
+
+    def is_idle(self):
+        """whether nothing needs to be drawn or animated
+        until the next window event"""
+
+        if not self.pending.empty() or self.animator.active():
+            return False
+        if self.screen_dirty:
+            return False
+        for layer_key in self.visible_layers():
+            layer = self.layers[layer_key]
+            if layer.needs_update() or layer.animating():
+                return False
+        return True
+
+    def visible_layers(self):
+        """names of the layers shown in the window, from the
+        bottom up, leaving out the hidden layers and those
+        covered by an opaque layer"""
+
+        # within a frame, the layers found for it
+        if self.visible is not None:
+            return self.visible
+
+        visible = []
+        covers = []
+        for layer_key in reversed(self.layers_order):
+            layer = self.layers[layer_key]
+            if layer.hidden:
+                continue
+            rect = layer.rect()
+            if any(cover.contains(rect) for cover in covers):
+                continue
+            visible.append(layer_key)
+            if layer.opaque:
+                covers.append(rect)
+        visible.reverse()
+        return visible
+
+    def find_visible(self):
+        """finds the shown layers for the next steps of the frame"""
+
+        self.visible = None
+        self.visible = self.visible_layers()
+
+    def idle_wait_time(self):
+        """time the loop can wait for events before
+        a layer's regular redraw"""
+
+        wait_time = self.idle_timeout
+        now = time.monotonic()
+        for layer in self.layers.values():
+            if layer.next_refresh is not None:
+                wait_time = min(wait_time, layer.next_refresh - now)
+        return max(0, wait_time)
+
+    def stop(self):
+        """stops the interaction loop and waits for its thread"""
+
+        self.stopping.set()
+
+        # wake the loop if it waits for events
+        self.wake()
+
+        thread = self.loop_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def frame_stats(self):
+        """returns the interaction loop's frame counters
+        and frame time percentiles"""
+
+        return self.scheduler.stats()
+
+    def on_ui_thread(self):
+        """whether the GUI can be changed directly from the
+        current thread, either the interaction loop's thread
+        or any thread before the loop starts"""
+
+        ui_thread = self.ui_thread
+        return ui_thread is None or ui_thread is threading.current_thread()
+
+    def submit(self, func, *args):
+        """queues a change of the GUI (function with arguments)
+        to be applied by the interaction loop's thread"""
+
+        # the first change of a batch wakes the loop if it is idle
+        wake = self.pending.empty()
+        self.pending.put((func, args))
+        ui_thread = self.ui_thread
+        if (wake and ui_thread is not None
+                and ui_thread is not threading.current_thread()):
+            self.wake()
+
+    def wake(self):
+        """wakes the interaction loop if it waits for events"""
+
+        if pygame.display.get_init():
+            pygame.event.post(pygame.event.Event(input_manager.WAKE_EVENT))
+
+    def set(self, obj, attribute, value):
+        """sets the attribute of an object, from the
+        interaction loop's thread"""
+
+        if self.on_ui_thread():
+            setattr(obj, attribute, value)
+        else:
+            self.submit(setattr, obj, attribute, value)
+
+    def apply_pending(self):
+        """applies the changes submitted by other threads"""
+
+        while True:
+            try:
+                func, args = self.pending.get_nowait()
+            except queue.Empty:
+                return
+            func(*args)
+
+    def actions_loop(self):
+        """event loop running the coroutine actions, started
+        in a background thread if no asyncio driver runs"""
+
+        if self.async_loop is None:
+            self.async_loop = asyncio.new_event_loop()
+            self.actions_thread = threading.Thread(
+                target=self.async_loop.run_forever, daemon=True)
+            self.actions_thread.start()
+        return self.async_loop
+
+    def render_pool(self):
+        """thread pool drawing the layers rendered in the
+        background, started when first needed"""
+
+        if self.render_workers is None:
+            self.render_workers = ThreadPoolExecutor(
+                thread_name_prefix="pygui-render")
+        return self.render_workers
+
+    def spawn(self, awaitable, layer_obj=None):
+        """runs a coroutine action without blocking the frames,
+        the object being told when it starts and ends, returns
+        its future, which can be cancelled"""
+
+        loop = self.actions_loop()
+        if self.actions_thread is None:
+            future = asyncio.ensure_future(awaitable, loop=loop)
+        else:
+            future = asyncio.run_coroutine_threadsafe(awaited(awaitable),
+                                                      loop)
+
+        # the end of the action is handled by the interaction loop
+        if layer_obj is not None:
+            layer_obj.action_started(future)
+        future.add_done_callback(
+            lambda future: self.submit(self.action_done, future, layer_obj))
+        return future
+
+    def action_done(self, future, layer_obj):
+        """ends a coroutine action, reporting its error
+        without stopping the interaction loop"""
+
+        if layer_obj is not None:
+            layer_obj.action_done(future)
+        if not future.cancelled():
+            error = future.exception()
+            if error is not None:
+                self.action_error(error, layer_obj)
+
+    def action_error(self, error, layer_obj):
+        """reports the error of a coroutine action, printing
+        its traceback, can be replaced to handle it"""
+
+        traceback.print_exception(type(error), error, error.__traceback__)
+
+    def enable_profiling(self):
+        """starts timing the frame phases and the objects'
+        redraws and callbacks, returns the profiler"""
+
+        if self.profiler is None:
+            self.profiler = Profiler()
+        return self.profiler
+
+    def disable_profiling(self):
+        """stops timing the frames"""
+
+        self.profiler = None
+
+    def start_recording(self, file_name):
+        """starts logging the events and cursor position of
+        each frame to a file, which recorder.replay feeds back"""
+
+        self.stop_recording()
+        self.recorder = Recorder(file_name, self.fps)
+        return self.recorder
+
+    def stop_recording(self):
+        """stops logging the input"""
+
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def set_focus(self, layer_obj):
+        """gives the keyboard focus to an object, or to
+        none of them"""
+
+        previous = self.focus
+        if previous is layer_obj:
+            return
+        self.focus = layer_obj
+        for obj in (previous, layer_obj):
+            if obj is not None:
+                obj.invalidate()
+
+    def capture_pointer(self, layer_obj):
+        """sends the pointer's motion and button releases
+        directly to an object, such as during a drag"""
+
+        self.capture = layer_obj
+
+    def release_pointer(self):
+        """routes pointer events normally again"""
+
+        self.capture = None
+
+    def sample_pointer(self, late_events=None):
+        """gives the object capturing the pointer the motion
+        queued since the frame's events were taken, or the late
+        events of a replayed frame, returns when the motion was
+        taken or None if there was none"""
+
+        # replayed motion was taken when it was recorded
+        if late_events is not None:
+            for event in late_events:
+                self.router.dispatch(event.pos, event)
+            return None
+
+        if self.capture is None or self.headless:
+            return None
+
+        # motion after a pending release belongs to the next frame
+        if pygame.event.peek(pygame.MOUSEBUTTONUP):
+            return None
+        motions = pygame.event.get(pygame.MOUSEMOTION)
+        if not motions:
+            return None
+
+        # only the latest position matters to the captured object
+        sampled = time.monotonic()
+        event = motions[-1]
+        if self.recorder is not None:
+            self.recorder.record_late(self.frame_time, event.pos, [event])
+        self.router.dispatch(event.pos, event)
+        return sampled
+
     def add_layer(self, layer_name, layer):
         """add gui layer to the window"""
 
+        # layers are added by the interaction loop's thread
+        if not self.on_ui_thread():
+            self.submit(self.add_layer, layer_name, layer)
+            return
+
         self.layers[layer_name] = layer
         self.layers_order.append(layer_name)
+        self.visible = None
 
     def to_draw(self, layer_name):
         """requests a layer to be redrawn"""
 
+        if not self.on_ui_thread():
+            self.submit(self.to_draw, layer_name)
+            return
+
         self.layers[layer_name].to_draw = True
 
     def to_draw_all(self):
@@ -76,8 +474,9 @@ class GUI:
     def save_settings(self):
         """closes the gui and saves settings"""
 
-        file_name = self.settings_file_name
-        if file_name is not None:
-            with open(self.settings_file_name, "w") as file:
-                json.dump(self.settings, file)
+        if self.settings_store is not None:
+            self.settings_store.close(self.settings)
+        if self.render_workers is not None:
+            self.render_workers.shutdown()
+        self.stop_recording()
         pygame.quit()
@@ -3,71 +3,180 @@ import time
 import threading
 import _thread
 
+from pygui.layer import merge_rects
+from pygui.profiler import span
+
+# event posted to wake the loop waiting for events, never dispatched
+WAKE_EVENT = pygame.event.custom_type()
+
 
 def activate(g_u_i):
-    """Starts the interaction loop of the window"""
+    """Starts the interaction loop of the window, layers
+    being redrawn regularly if they set a refresh rate,
+    returns the loop's thread"""
 
     # start input manager thread
-    manager_loop = gui_input_manager_loop
-    threading.Thread(target=manager_loop, args=(g_u_i, g_u_i.fps)).start()
     g_u_i.to_draw_all()
-
-    # start regular display update thread
-    def display_full_update():
-        while True:
-            # request redrawing of all layers
-            g_u_i.to_draw_all()
-            time.sleep(1 / g_u_i.rus)
-
-    threading.Thread(target=display_full_update).start()
+    manager_loop = gui_input_manager_loop
+    g_u_i.loop_thread = threading.Thread(target=manager_loop,
+                                         args=(g_u_i, g_u_i.fps))
+    g_u_i.loop_thread.start()
+    return g_u_i.loop_thread
 
 
 def gui_input_manager_loop(g_u_i, fps):
     """Check for interface inputs and update the display"""
 
     try:
-        last_time = time.time()
-        while True:
-            # keep the frame rate under or equal to FRAMES_PER_SECOND
-            new_time = time.time()
-            time.sleep(abs(1/fps - (new_time - last_time)))
-            last_time = time.time()
-
-            with threading.Lock():
-
-                # get cursor position
-                cur_pos = pygame.mouse.get_pos()
-
-                for layer_key in g_u_i.layers_order:
-                    g_u_i.layers[layer_key].tick_event(cur_pos)
-
-                # check window events
-                for event in pygame.event.get():
-
-                    # transfer window events to the screen layers
-                    for layer_key in g_u_i.layers_order:
-                        g_u_i.layers[layer_key].event(cur_pos, event)
-
-                    # if the window is being closed, register a close request
-                    if event.type == pygame.QUIT:
-                        _thread.interrupt_main()
-                        return
-
-                # draw the layers that have requested a draw
-                drawing_needed = False
-                for key in g_u_i.layers_order:
-                    if g_u_i.layers[key].to_draw:
-                        g_u_i.layers[key].to_draw = False
-                        g_u_i.layers[key].update()
-                        drawing_needed = True
-
-                # if layers were redrawn, update display
-                if drawing_needed:
-                    # add all layers to the screen
-                    for layer_key in g_u_i.layers_order:
-                        g_u_i.screen.blit(g_u_i.layers[layer_key].surface, (0, 0))
-
-                # update the window display
-                pygame.display.update()
+        scheduler = g_u_i.scheduler
+        scheduler.set_fps(fps)
+
+        # changes from other threads are now queued for this thread
+        g_u_i.ui_thread = threading.current_thread()
+
+        # when the event queue was last emptied
+        drained = time.monotonic()
+
+        while not g_u_i.stopping.is_set():
+
+            # when nothing changes, block until an event comes
+            # or a layer's regular redraw is due
+            if g_u_i.is_idle():
+                timeout = int(1000 * g_u_i.idle_wait_time())
+                event = pygame.event.wait(max(1, timeout))
+                input_time = time.monotonic()
+                events = [] if event.type == pygame.NOEVENT else [event]
+                events.extend(pygame.event.get())
+                scheduler.wake()
+                render = True
+
+            # otherwise wait for the next frame deadline, renders
+            # are skipped when the loop is running late
+            else:
+                render = scheduler.begin_frame()
+                events = pygame.event.get()
+
+                # the events may have waited since the queue was
+                # emptied, their latency counts it
+                input_time = drained
+            drained = time.monotonic()
+
+            # if the window is being closed, register a close request
+            if not frame(g_u_i, events, render, input_time=input_time):
+                g_u_i.stopping.set()
+                _thread.interrupt_main()
+                return
+
+            scheduler.end_frame()
     except pygame.error:
         pass
+
+
+def frame(g_u_i, events, render=True, now=None, cur_pos=None,
+          input_time=None, late_events=None):
+    """runs one frame of the interaction loop: applies pending
+    changes, ticks the layers, transfers the events, runs the
+    animations and if requested redraws the display, returns
+    False once the window is closed, input_time being when the
+    events were received, by default now, and late_events the
+    pointer motion of a replayed frame given just before drawing"""
+
+    # time of the frame, the current time unless stepping
+    if now is None:
+        now = time.monotonic()
+    g_u_i.frame_time = now
+
+    # events only waking the loop are not for the layers
+    events = [event for event in events if event.type != WAKE_EVENT]
+
+    # when the frame's input was taken, to measure its latency
+    if not events:
+        input_time = None
+    elif input_time is None:
+        input_time = time.monotonic()
+
+    with span(g_u_i, "frame"):
+
+        # apply the changes submitted by other threads
+        with span(g_u_i, "apply pending"):
+            g_u_i.apply_pending()
+        g_u_i.find_visible()
+
+        # get cursor position, unless replaying it
+        if cur_pos is None:
+            cur_pos = g_u_i.cursor_pos(events)
+
+        # log the frame's input when recording
+        if g_u_i.recorder is not None:
+            g_u_i.recorder.record(now, cur_pos, events, render)
+
+        with span(g_u_i, "tick"):
+            for layer_key in g_u_i.visible_layers():
+                g_u_i.layers[layer_key].tick_event(cur_pos)
+
+        # check window events
+        with span(g_u_i, "events"):
+            for event in events:
+
+                # transfer window events to the layers reacting to them
+                g_u_i.router.dispatch(cur_pos, event)
+
+                # stop at a close request
+                if event.type == pygame.QUIT:
+                    g_u_i.visible = None
+                    return False
+
+        # move the running animations to the frame's time
+        with span(g_u_i, "animations"):
+            g_u_i.animator.tick()
+
+        # request the regular redraws that are due
+        for layer_key in g_u_i.layers_order:
+            g_u_i.layers[layer_key].refresh(now)
+
+        # input is processed even in skipped frames
+        if render:
+            draw(g_u_i, input_time, late_events)
+        g_u_i.visible = None
+        return True
+
+
+def draw(g_u_i, input_time=None, late_events=None):
+    """redraws the layers that requested it and
+    updates the changed regions of the display, recording
+    the latency of the input taken at a time"""
+
+    # the events and actions of the frame may have changed the layers
+    g_u_i.find_visible()
+
+    # move the object capturing the pointer to its latest position
+    sampled = g_u_i.sample_pointer(late_events)
+    if sampled is not None:
+        input_time = sampled
+
+    # regions uncovered by moved layers
+    dirty_rects = g_u_i.screen_dirty
+    g_u_i.screen_dirty = []
+
+    # draw the shown layers that have requested a draw
+    changes = []
+    for key in g_u_i.visible_layers():
+        layer = g_u_i.layers[key]
+        if layer.needs_update():
+            with span(g_u_i, "update " + str(key)):
+                rects = layer.update()
+            if rects:
+                changes.append((layer, rects))
+                dirty_rects.extend(rect.move(layer.pos) for rect in rects)
+
+    # if layers were redrawn, recompose and update
+    # only the changed regions of the display
+    if dirty_rects:
+        with span(g_u_i, "composite"):
+            screen_rect = pygame.Rect((0, 0), g_u_i.size)
+            dirty_rects = [rect.clip(screen_rect) for rect
+                           in merge_rects(dirty_rects)]
+            g_u_i.backend.present(changes, dirty_rects)
+
+        if input_time is not None:
+            g_u_i.scheduler.record_latency(time.monotonic() - input_time)
@@ -1,6 +1,12 @@
 from utility_functions import geometrical_functions as g_f
 from utility_functions import algebraic_functions as a_f
 
+from pygui.animation import ease_out
+from pygui.spatial_index import SpatialGrid
+from pygui.surface_pool import SurfacePool
+
+import inspect
+import math
 import pygame
 
 
@@ -13,92 +19,635 @@ def emp():
 GREY = (100, 100, 100)
 EMP = (emp, ())
 
+# shine level after a click and seconds it takes to fade
+SHINE = 5
+SHINE_DURATION = 0.12
+
+# seconds taken by input buttons to grow or shrink
+RESIZE_DURATION = 0.1
+TRANSPARENT = (0, 0, 0, 0)
+
+# above this many dirty rects, they are merged into one
+MAX_DIRTY_RECTS = 16
+
+
+def merge_rects(rects):
+    """merges overlapping rects together, and all of
+    them into one if too many are left"""
+
+    merged = []
+    for count, rect in enumerate(rects):
+        rect = pygame.Rect(rect)
+
+        # absorb the merged rects it overlaps, as it grows
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+
+        # too many rects are left, the rest joins their union
+        if len(merged) > MAX_DIRTY_RECTS:
+            union = merged[0].unionall(merged[1:])
+            for rest in rects[count + 1:]:
+                union.union_ip(rest)
+            return [union]
+    return merged
+
 
 def call(func_with_args):
-    """call function with arguments"""
+    """call function with arguments, returns its result"""
+
+    return func_with_args[0](*func_with_args[1])
+
+
+def object_name(layer_obj):
+    """name of an object in profiles"""
+
+    return type(layer_obj).__name__ + "#" + str(layer_obj.z_index)
+
+
+def z_order(layer_obj):
+    """sorting key giving the drawing order of an object"""
+
+    return layer_obj.z_index
+
+
+# events dispatched only to objects under the cursor
+POINTER_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP,
+                  pygame.MOUSEMOTION)
+
+# event types reacted to by each event method
+EVENT_METHODS = (
+    (pygame.MOUSEBUTTONDOWN, "mouse_button_down"),
+    (pygame.MOUSEBUTTONUP, "mouse_button_up"),
+    (pygame.MOUSEMOTION, "mouse_motion"),
+    (pygame.KEYDOWN, "key_down"),
+    (pygame.TEXTINPUT, "text_input")
+)
+
+# event types handled by classes, by class
+handled_event_types = {}
+
+
+def overridden_event_types(cls, base):
+    """event types whose methods are overridden by a class,
+    or None if it overrides the event method itself and
+    handles every type"""
+
+    key = (cls, base)
+    if key not in handled_event_types:
+        if cls.event is not base.event:
+            event_types = None
+        else:
+            event_types = frozenset(
+                event_type for event_type, method in EVENT_METHODS
+                if getattr(cls, method) is not getattr(base, method))
+        handled_event_types[key] = event_types
+    return handled_event_types[key]
+
+
+# whether the event method of each class takes the cursor position
+event_takes_pos = {}
+
+
+def object_event(layer_obj, event, cur_pos):
+    """calls an object's event method, without the cursor position
+    for classes overriding it as event(self, event) like before
+    positions were passed, returns whether the event was consumed"""
+
+    layer_obj.layer.event_pos = cur_pos
+    cls = type(layer_obj)
+    if cls not in event_takes_pos:
+        try:
+            inspect.signature(cls.event).bind(None, event, cur_pos)
+            event_takes_pos[cls] = True
+        except TypeError:
+            event_takes_pos[cls] = False
+    if event_takes_pos[cls]:
+        return layer_obj.event(event, cur_pos)
+    return layer_obj.event(event)
+
+
+def dispatch_event(handler, event, cur_pos):
+    """calls the event method of a layer or object matching
+    an event, returns whether it consumed the event"""
+
+    for event_type, method in EVENT_METHODS:
+        if event.type == event_type:
+            return bool(getattr(handler, method)(event, cur_pos))
+    return False
+
+
+class LayerObjects(dict):
+    """dictionary of layer objects that keeps the
+    layer's spatial index and z-order up to date"""
+
+    def __init__(self, layer):
+        super().__init__()
+        self.layer = layer
+
+    def on_ui_thread(self):
+        """whether the layer can be changed from this thread,
+        changes from other threads being queued otherwise"""
+
+        return self.layer.g_u_i.on_ui_thread()
+
+    def __setitem__(self, key, layer_obj):
+
+        # objects are added by the interaction loop's thread
+        if not self.on_ui_thread():
+            self.layer.g_u_i.submit(self.__setitem__, key, layer_obj)
+            return
+
+        # a replaced object keeps the drawing order of its key
+        z_index = None
+        if key in self:
+            z_index = self[key].z_index
+            self.layer.unregister(self[key])
+
+        super().__setitem__(key, layer_obj)
+        self.layer.register(layer_obj, z_index)
+
+    def __delitem__(self, key):
+        if not self.on_ui_thread():
+            self.layer.g_u_i.submit(self.pop, key, None)
+            return
+
+        self.layer.unregister(self[key])
+        super().__delitem__(key)
+
+    def pop(self, key, *default):
+
+        # from other threads, the object is returned now
+        # and removed by the interaction loop's thread
+        if not self.on_ui_thread():
+            self.layer.g_u_i.submit(self.pop, key, None)
+            if key in self:
+                return self[key]
+            if default:
+                return default[0]
+            raise KeyError(key)
+
+        if key in self:
+            self.layer.unregister(self[key])
+        return super().pop(key, *default)
+
+    def popitem(self):
+        if not self.on_ui_thread():
+            key = next(reversed(self))
+            return key, self.pop(key)
+
+        key, layer_obj = super().popitem()
+        self.layer.unregister(layer_obj)
+        return key, layer_obj
+
+    def setdefault(self, key, layer_obj=None):
+        if key not in self:
+            self[key] = layer_obj
+            return layer_obj
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, layer_obj in dict(*args, **kwargs).items():
+            self[key] = layer_obj
+
+    def clear(self):
+        if not self.on_ui_thread():
+            self.layer.g_u_i.submit(self.clear)
+            return
 
-    func_with_args[0](*func_with_args[1])
+        for layer_obj in self.values():
+            self.layer.unregister(layer_obj)
+        super().clear()
 
 
 class Layer:
     """parent class for GUI layers, contains
     a surface that can be redrawn"""
 
-    def __init__(self, g_u_i, size):
+    def __init__(self, g_u_i, size, refresh_rate=None, pos=(0, 0),
+                 background=False, opaque=False):
 
         """defines if the layer only takes up
-        half the window"""
+        half the window, and where its top left
+        corner is in the window"""
         self.size = size
+        self.pos = pos
+
+        """number of full redraws per second,
+        None to only redraw upon request"""
+        self.refresh_rate = refresh_rate
+        self.next_refresh = None
+
+        """opaque layers cover the layers below them, which are
+        then neither drawn nor given events, and hidden layers
+        are neither shown nor given events"""
+        self.opaque = opaque
+        self.hidden = False
+
+        """cursor position in the layer of the event being given
+        to an object, for event methods called without it"""
+        self.event_pos = (0, 0)
 
         # initialize the layer's surface
         self.surface = None
         self.reset()
 
+        """when rendering in the background, the layer is drawn
+        entirely on its surface in a worker thread while the
+        front surface, the last complete drawing, is displayed"""
+        self.background = background
+        self.front = None
+        self.rendering = None
+        if background:
+            self.front = self.new_surface()
+
+        # small surfaces reused for temporary drawings
+        self.surface_pool = SurfacePool()
+
         # store reference to GUI window
         self.g_u_i = g_u_i
         self.font = g_u_i.font
         self.font_u = g_u_i.font_u
 
-        # stores whether the surface needs to be redrawn
+        # stores whether the surface needs to be redrawn entirely
         self.to_draw = False
 
+        # regions of the surface that need to be redrawn
+        self.dirty_rects = []
+
+        # spatial index of the objects for hit-testing
+        self.grid = SpatialGrid()
+
+        # objects without bounds, which receive every tick and click
+        self.unindexed = set()
+
+        # objects needing ticks away from the cursor (hover, shine, drag)
+        self.awake = set()
+
+        # objects subscribed to each event type, and to all of them
+        self.subscribers = {}
+        self.all_events = set()
+
+        # drawing order given to the next added object
+        self.next_z_index = 0
+
         """list of objects stored inside the layer"""
-        self.layer_objects = {}
+        self.layer_objects = LayerObjects(self)
 
     def reset(self):
-        """resets the layer's surface"""
+        """resets the layer's surface, clearing it
+        instead of reallocating it if possible"""
+
+        if self.surface is None or self.surface.get_size() != tuple(self.size):
+            self.surface = self.new_surface()
+        else:
+            self.surface.fill(TRANSPARENT)
+
+    def new_surface(self):
+        """surface of the layer's size, transparent unless the
+        layer is opaque, in the display's pixel format if there
+        is one such that blits take the fast path"""
+
+        if self.opaque:
+            surface = pygame.Surface(self.size)
+        else:
+            surface = pygame.Surface(self.size, pygame.SRCALPHA)
 
-        self.surface = pygame.Surface(self.size, pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            if self.opaque:
+                return surface.convert()
+            return surface.convert_alpha()
+        return surface
+
+    def rect(self):
+        """area of the layer in the window"""
+
+        return pygame.Rect(self.pos, self.size)
+
+    def front_surface(self):
+        """surface shown in the window"""
+
+        if self.front is None:
+            return self.surface
+        return self.front
+
+    def to_local(self, pos):
+        """converts a window position to the layer's coordinates"""
+
+        return pos[0] - self.pos[0], pos[1] - self.pos[1]
+
+    def move(self, pos):
+        """moves the layer in the window"""
+
+        self.g_u_i.screen_dirty.append(self.rect())
+        self.pos = pos
+        self.g_u_i.screen_dirty.append(self.rect())
+        self.g_u_i.visible = None
+
+    def hide(self):
+        """stops showing the layer"""
+
+        if not self.hidden:
+            self.hidden = True
+            self.g_u_i.screen_dirty.append(self.rect())
+            self.g_u_i.visible = None
+
+    def show(self):
+        """shows the layer again"""
+
+        if self.hidden:
+            self.hidden = False
+            self.g_u_i.screen_dirty.append(self.rect())
+            self.g_u_i.visible = None
+
+    def needs_update(self):
+        """whether the layer has something to redraw"""
+
+        return (self.to_draw or bool(self.dirty_rects)
+                or self.rendering is not None)
+
+    def refresh(self, now):
+        """requests a full redraw if the regular one is due"""
+
+        if self.refresh_rate is None:
+            return
+        if self.next_refresh is None or now >= self.next_refresh:
+            self.to_draw = True
+            self.next_refresh = now + 1 / self.refresh_rate
+
+    def animating(self):
+        """whether objects change without input and
+        need frames to keep running"""
+
+        return any(layer_obj.animating() for layer_obj in self.awake)
+
+    def mark_dirty(self, rect):
+        """requests a region of the layer to be redrawn"""
+
+        self.dirty_rects.append(pygame.Rect(rect))
 
     def update(self):
+        """update the current layer, redrawing it entirely
+        if requested or only its dirty regions otherwise,
+        and returns the rects that changed"""
+
+        if self.background:
+            return self.update_in_background()
+
+        surface_rect = pygame.Rect((0, 0), self.size)
+        rects = [rect.clip(surface_rect)
+                 for rect in merge_rects(self.dirty_rects)]
+        rects = [rect for rect in rects if rect.width and rect.height]
+        self.dirty_rects = []
+
+        # redraw entirely if requested or if most of it changed
+        dirty_area = sum(rect.width * rect.height for rect in rects)
+        if self.to_draw or 2 * dirty_area > self.size[0] * self.size[1]:
+            self.to_draw = False
+            self.reindex()
+            self.full_update()
+            return [surface_rect]
+
+        # redraw the dirty regions with the objects they touch
+        for rect in rects:
+            self.surface.set_clip(rect)
+            self.surface.fill(TRANSPARENT, rect)
+
+            touched = self.grid.query_rect(rect)
+            touched.update(self.unindexed)
+            self.redraw_all(sorted(touched, key=z_order))
+
+        self.surface.set_clip(None)
+        return rects
+
+    def update_in_background(self):
+        """shows the drawing finished by the worker thread and
+        starts the next one if requested, returns the rects that
+        changed"""
+
+        rects = []
+        rendering = self.rendering
+        if rendering is not None:
+            if not rendering.done():
+                return rects
+
+            # swap the finished drawing to the front
+            self.rendering = None
+            rendering.result()
+            self.front, self.surface = self.surface, self.front
+            rects.append(pygame.Rect((0, 0), self.size))
+
+        if self.to_draw or self.dirty_rects:
+            self.to_draw = False
+            self.dirty_rects = []
+            self.reindex()
+            # the objects are listed now, as they may change meanwhile
+            self.rendering = self.g_u_i.render_pool().submit(
+                self.full_update, list(self.layer_objects.values()))
+        return rects
+
+    def reindex(self):
+        """updates the spatial index with the objects' bounds,
+        which may have changed without invalidate() when a full
+        redraw was requested instead"""
+
+        object_rects = self.grid.object_rects
+        for layer_obj in list(object_rects):
+            rect = layer_obj.bounds()
+            if rect is not None and rect != object_rects[layer_obj]:
+                self.grid.move(layer_obj, rect)
+
+    def full_update(self, layer_objs=None):
         """update the current layer resetting
         it and redrawing it"""
 
         # reset surface
         self.reset()
 
-        # redraw surface
-        self.redraw()
+        # redraw surface and objects of layer
+        if layer_objs is None:
+            layer_objs = self.layer_objects.values()
+        self.redraw_all(layer_objs)
+
+    def redraw_all(self, layer_objs):
+        """redraws the layer's surface then objects,
+        timing each one when profiling"""
 
-        # redraw objects of layer and add blit their surface
-        for object_key in self.layer_objects:
-            layer_obj = self.layer_objects[object_key]
+        profiler = self.g_u_i.profiler
+        if profiler is None:
+            self.redraw()
+            for layer_obj in layer_objs:
+                layer_obj.redraw()
+            return
+
+        start = profiler.begin()
+        self.redraw()
+        profiler.end(type(self).__name__ + ".redraw", start)
+        for layer_obj in layer_objs:
+            start = profiler.begin()
             layer_obj.redraw()
+            profiler.end(object_name(layer_obj) + ".redraw", start)
 
     def redraw(self):
         """redraws the layer's surface"""
 
         pass
 
+    def register(self, layer_obj, z_index=None):
+        """adds an object to the spatial index"""
+
+        if z_index is None:
+            z_index = self.next_z_index
+            self.next_z_index += 1
+        layer_obj.z_index = z_index
+
+        # request the drawing of the new object
+        rect = layer_obj.bounds()
+        if rect is None:
+            self.unindexed.add(layer_obj)
+            self.to_draw = True
+        else:
+            self.grid.insert(layer_obj, rect)
+            self.mark_dirty(rect)
+        self.track(layer_obj)
+
+        # subscribe the object to the event types it handles
+        event_types = layer_obj.event_types()
+        if event_types is None:
+            self.all_events.add(layer_obj)
+        else:
+            for event_type in event_types:
+                self.subscribers.setdefault(event_type, set()).add(layer_obj)
+
+    def unregister(self, layer_obj):
+        """removes an object from the spatial index"""
+
+        # request the erasing of the removed object
+        if layer_obj in self.unindexed:
+            self.to_draw = True
+        else:
+            self.mark_dirty(self.grid.object_rects[layer_obj])
+
+        self.grid.remove(layer_obj)
+        self.unindexed.discard(layer_obj)
+        self.awake.discard(layer_obj)
+        self.all_events.discard(layer_obj)
+        for subscribers in self.subscribers.values():
+            subscribers.discard(layer_obj)
+        layer_obj.z_index = None
+
+        # removed objects lose the keyboard focus and pointer
+        if self.g_u_i.focus is layer_obj:
+            self.g_u_i.set_focus(None)
+        if self.g_u_i.capture is layer_obj:
+            self.g_u_i.release_pointer()
+
+    def invalidate(self, layer_obj):
+        """requests the redraw of an object, at its previous
+        and current bounds, and updates the spatial index"""
+
+        # the index is updated by the interaction loop's thread
+        if not self.g_u_i.on_ui_thread():
+            self.g_u_i.submit(self.invalidate, layer_obj)
+            return
+
+        # the object may have been removed since
+        if layer_obj.z_index is None:
+            return
+
+        # objects without bounds need a full redraw
+        if layer_obj in self.unindexed:
+            self.to_draw = True
+            return
+
+        rect = layer_obj.bounds()
+        self.mark_dirty(self.grid.object_rects[layer_obj])
+        self.mark_dirty(rect)
+        self.grid.move(layer_obj, rect)
+
+    def track(self, layer_obj):
+        """keeps an object ticking while it needs it"""
+
+        if layer_obj.needs_tick():
+            self.awake.add(layer_obj)
+        else:
+            self.awake.discard(layer_obj)
+
+    def objects_at(self, pos):
+        """objects that may react at a position"""
+
+        candidates = self.grid.query_point(pos)
+        candidates.update(self.unindexed)
+        candidates.update(self.awake)
+        return candidates
+
     def tick_event(self, cur_pos):
-        """react to window regular tick"""
+        """react to window regular tick, with the cursor
+        position in the window"""
 
+        cur_pos = self.to_local(cur_pos)
         self.tick(cur_pos)
 
-        # transfer tick event to objects
-        for object_key in self.layer_objects:
-            self.layer_objects[object_key].tick_event(cur_pos)
+        # transfer tick event to objects near the cursor
+        # or still changing
+        for layer_obj in sorted(self.objects_at(cur_pos), key=z_order):
+            layer_obj.tick_event(cur_pos)
+            self.track(layer_obj)
 
     def tick(self, cur_pos):
         """react to tick event"""
 
         pass
 
-    def event(self, cur_pos, event):
-        """reacts to a certain window event"""
+    def event_types(self):
+        """event types the layer itself reacts to,
+        or None for all of them"""
 
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            self.mouse_button_down(event, cur_pos)
+        return overridden_event_types(type(self), Layer)
 
-        elif event.type == pygame.MOUSEBUTTONUP:
-            self.mouse_button_up(event, cur_pos)
+    def handles(self, event_type):
+        """whether the layer or one of its objects
+        reacts to an event type"""
 
-        elif event.type == pygame.KEYDOWN:
-            self.key_down(event, cur_pos)
+        if self.all_events or self.subscribers.get(event_type):
+            return True
+        event_types = self.event_types()
+        return event_types is None or event_type in event_types
 
-        # transfer events to objects
-        for object_key in self.layer_objects:
-            self.layer_objects[object_key].event(event)
+    def event(self, cur_pos, event):
+        """reacts to a certain window event, with the cursor
+        position in the window, returns whether it was consumed,
+        the objects getting it from the top one down"""
+
+        cur_pos = self.to_local(cur_pos)
+        if dispatch_event(self, event, cur_pos):
+            return True
+
+        # objects subscribed to the event type, for pointer
+        # events only the ones under the cursor
+        subscribers = self.subscribers.get(event.type, ())
+        if event.type in POINTER_EVENTS:
+            targets = self.objects_at(cur_pos).intersection(subscribers)
+        else:
+            targets = set(subscribers)
+        targets.update(self.all_events)
+
+        # transfer the event from the top object down
+        # until one consumes it
+        profiler = self.g_u_i.profiler
+        for layer_obj in sorted(targets, key=z_order, reverse=True):
+            if profiler is None:
+                consumed = object_event(layer_obj, event, cur_pos)
+            else:
+                start = profiler.begin()
+                consumed = object_event(layer_obj, event, cur_pos)
+                profiler.end(object_name(layer_obj) + ".event", start)
+            self.track(layer_obj)
+            if consumed:
+                return True
+        return False
 
     def mouse_button_down(self, event, cur_pos):
         """reacts to mouse button down event"""
@@ -110,22 +659,103 @@ class Layer:
 
         pass
 
+    def mouse_motion(self, event, cur_pos):
+        """reacts to mouse motion event"""
+
+        pass
+
     def key_down(self, event, cur_pos):
         """reacts to key down event"""
 
         pass
 
+    def text_input(self, event, cur_pos):
+        """reacts to text input event"""
+
+        pass
+
 
 class LayerObject:
     """parent class for layer objects,
     draws on a layer surface"""
 
+    """attributes are stored in slots rather than a dictionary
+    and click actions are methods rather than closures, such that
+    a Button takes about 140 bytes instead of 900, a ToggleButton
+    140 instead of 1250 and an InputButton 220 instead of 1640
+    (CPython 3.11, 64-bit), widget_array.IndicatorArray stores
+    tens of thousands of indicators in 37 bytes each"""
+    __slots__ = ("layer", "font", "z_index")
+
     def __init__(self, layer):
 
         # store reference to GUI window
         self.layer = layer
         self.font = layer.font
 
+        # drawing order, set once added to the layer
+        self.z_index = None
+
+    def bounds(self):
+        """rect covered by the object on the layer, or None
+        if it should receive every tick and click"""
+
+        return None
+
+    def needs_tick(self):
+        """whether the object needs ticks while
+        the cursor is away from it"""
+
+        return False
+
+    def animating(self):
+        """whether the object changes without input and needs
+        ticks even while the interaction loop is idle"""
+
+        return False
+
+    def tween(self, attribute, end, duration, easing=ease_out):
+        """animates an attribute towards a value, or sets
+        it directly if the object is not in a layer yet"""
+
+        if self.z_index is None:
+            setattr(self, attribute, end)
+        else:
+            animator = self.layer.g_u_i.animator
+            animator.animate(self, attribute, end, duration,
+                             easing=easing)
+
+    def run_action(self, func_with_args):
+        """calls an action, a coroutine action being run on the
+        GUI's event loop without blocking the frame"""
+
+        result = call(func_with_args)
+        if inspect.isawaitable(result):
+            self.layer.g_u_i.spawn(result, self)
+
+    def action_started(self, future):
+        """reacts to a coroutine action starting"""
+
+        pass
+
+    def action_done(self, future):
+        """reacts to a coroutine action ending"""
+
+        pass
+
+    def render_text(self, text, color):
+        """returns the surface of a text in the object's
+        font, from the GUI's text cache"""
+
+        return self.layer.g_u_i.text_cache.render(self.font, text, color)
+
+    def invalidate(self):
+        """requests the object to be redrawn, after
+        a change of appearance, position or size"""
+
+        if self.z_index is not None:
+            self.layer.invalidate(self)
+
     def redraw(self):
         """redraws the layer's surface"""
 
@@ -136,20 +766,21 @@ class LayerObject:
 
         pass
 
-    def event(self, event):
-        """reacts to a certain window event"""
+    def event_types(self):
+        """event types the object reacts to, or None
+        for all of them"""
 
-        # get cursor position on screen and on map
-        cur_pos = pygame.mouse.get_pos()
+        return overridden_event_types(type(self), LayerObject)
 
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            self.mouse_button_down(event, cur_pos)
+    def event(self, event, cur_pos=None):
+        """reacts to a certain window event, returns
+        whether it was consumed"""
 
-        elif event.type == pygame.MOUSEBUTTONUP:
-            self.mouse_button_up(event, cur_pos)
+        # get the position the event is being given at if not given
+        if cur_pos is None:
+            cur_pos = self.layer.event_pos
 
-        elif event.type == pygame.KEYDOWN:
-            self.key_down(event, cur_pos)
+        return dispatch_event(self, event, cur_pos)
 
     def mouse_button_down(self, event, cur_pos):
         """reacts to mouse button down event"""
@@ -161,25 +792,44 @@ class LayerObject:
 
         pass
 
+    def mouse_motion(self, event, cur_pos):
+        """reacts to mouse motion event"""
+
+        pass
+
     def key_down(self, event, cur_pos):
         """reacts to key down event"""
 
         pass
 
+    def text_input(self, event, cur_pos):
+        """reacts to text input event"""
+
+        pass
+
 
 class Label(LayerObject):
     """label draws text on layer"""
 
+    __slots__ = ("text", "color", "pos")
+
     def __init__(self, layer, text, color, pos):
         super().__init__(layer)
         self.text = text
         self.color = color
         self.pos = pos
 
+    def bounds(self):
+        """rect covered by the text"""
+
+        label_rect = pygame.Rect((0, 0), self.font.size(self.text))
+        label_rect.midleft = self.pos
+        return label_rect
+
     def redraw(self):
         """draw text on layer"""
 
-        label = self.font.render(self.text, True, self.color)
+        label = self.render_text(self.text, self.color)
         label_pos = label.get_rect(midleft=self.pos)
         self.layer.surface.blit(label, label_pos)
 
@@ -187,29 +837,132 @@ class Label(LayerObject):
 class Button(LayerObject):
     """draws circle on layer and has 3 click functions"""
 
+    __slots__ = ("color", "text", "_pos", "_size", "hover", "shine",
+                 "left", "middle", "right", "task")
+
     def __init__(self, layer, color, pos, size, text,
                  left=EMP, middle=EMP, right=EMP):
         super().__init__(layer)
 
         # button parameters
         self.color = color
-        self.pos = pos
-        self.size = size
         self.text = text
+        self._pos = pos
+        self._size = size
 
         # change color when hovering
         self.hover = False
 
         # for shining after click
-        self.shine = False
+        self.shine = 0
 
         # click actions
-        self.left_action = lambda: call(left)
-        self.middle_action = lambda: call(middle)
-        self.right_action = lambda: call(right)
+        self.left = left
+        self.middle = middle
+        self.right = right
+
+        # future of the last coroutine action while it runs
+        self.task = None
+
+    def left_action(self):
+        """reacts to left click"""
+
+        self.run_action(self.left)
+
+    def middle_action(self):
+        """reacts to middle click"""
+
+        self.run_action(self.middle)
+
+    def right_action(self):
+        """reacts to right click"""
+
+        self.run_action(self.right)
+
+    def action_started(self, future):
+        """shows the button as busy while the action runs"""
+
+        self.task = future
+        self.invalidate()
+
+    def action_done(self, future):
+        """shows the button as idle again"""
+
+        if self.task is future:
+            self.task = None
+            self.invalidate()
+
+    def busy(self):
+        """whether a coroutine action of the button is running"""
+
+        return self.task is not None
+
+    def cancel_action(self):
+        """cancels the running coroutine action, if any"""
+
+        if self.task is not None:
+            self.task.cancel()
+
+    @property
+    def pos(self):
+        """center of the button"""
+
+        return self._pos
+
+    @pos.setter
+    def pos(self, pos):
+        self._pos = pos
+        self.invalidate()
+
+    @property
+    def size(self):
+        """radius of the button"""
+
+        return self._size
+
+    @size.setter
+    def size(self, size):
+        self._size = size
+        self.invalidate()
+
+    def local_bounds(self):
+        """rect covered by the hover circle and the text,
+        relative to the button's center"""
+
+        hover_shine_size = self.size * 1.2
+        circle_rect = pygame.Rect(0, 0, hover_shine_size * 2 + 2,
+                                  hover_shine_size * 2 + 2)
+        circle_rect.center = (0, 0)
+        label_rect = pygame.Rect((0, 0), self.font.size(self.text))
+        label_rect.midleft = (self.size * 2, 0)
+        return circle_rect.union(label_rect).inflate(2, 2)
+
+    def bounds(self):
+        """rect covered by the hover circle and the text"""
+
+        rect = self.local_bounds()
+        return rect.move(int(self.pos[0]), int(self.pos[1]))
+
+    def needs_tick(self):
+        """keep ticking while hovered"""
+
+        return self.hover
+
+    def start_shine(self):
+        """makes the button shine then fade"""
+
+        self.shine = SHINE
+        self.invalidate()
+        self.tween("shine", 0, SHINE_DURATION)
+
+    def shine_level(self):
+        """shine level, 0 when not shining"""
+
+        return math.ceil(self.shine)
 
     def mouse_button_down(self, event, cur_pos):
-        """react to mouse button down event"""
+        """react to mouse button down event, consuming
+        clicks inside the button"""
 
         # check if cursor is inside button
         if g_f.distance_2d(cur_pos, self.pos) < self.size:
@@ -217,78 +970,121 @@ class Button(LayerObject):
             # left click
             if event.button == 1:
                 self.left_action()
-                self.shine = 5
+                self.start_shine()
+                return True
 
             # middle click
             if event.button == 2:
                 self.middle_action()
-                self.shine = 5
+                self.start_shine()
+                return True
 
             # right click
             if event.button == 3:
                 self.right_action()
-                self.shine = 5
+                self.start_shine()
+                return True
+
+        return False
 
-    def hover_shine(self, pos):
-        """draws hover and click circles"""
+    def hover_shine(self, pos, surface=None):
+        """draws hover, click and busy circles"""
 
+        if surface is None:
+            surface = self.layer.surface
         hover_shine_size = self.size * 1.2
+        shine_level = self.shine_level()
 
-        if self.shine == 0:
+        # draw ring while an action is in progress
+        if self.busy():
+            pygame.draw.circle(surface, self.fill_color(), pos,
+                               hover_shine_size, 2)
+
+        if shine_level == 0:
             # draw hover circle if hovering
             if self.hover:
-                pygame.draw.circle(self.layer.surface,
-                                   a_f.inv_rgb(self.color),
+                pygame.draw.circle(surface, a_f.inv_rgb(self.color),
                                    pos, hover_shine_size)
         else:
-            # draw shine circle after click
-            surf = pygame.Surface(self.layer.size, pygame.SRCALPHA)
-            surf.set_alpha(int(255/self.shine))
+            # draw shine circle after click on a pooled
+            # surface sized to the circle
+            side = int(hover_shine_size * 2) + 2
+            surf = self.layer.surface_pool.get((side, side))
+            surf.set_alpha(int(255/shine_level))
             pygame.draw.circle(surf, a_f.inv_rgb(self.color),
-                               pos, hover_shine_size)
-            self.layer.surface.blit(surf, (0, 0))
+                               (side / 2, side / 2), hover_shine_size)
+            surface.blit(surf, (pos[0] - side / 2, pos[1] - side / 2))
 
-    def redraw(self):
-        """draw circle on layer"""
+    def fill_color(self):
+        """color of the button circle and text"""
+
+        return self.color
+
+    def look(self):
+        """state deciding the appearance of the button"""
+
+        return (self.shine_level(), self.hover, self.fill_color(),
+                self.busy())
+
+    def paint(self, surface, pos):
+        """draws the button centered at a position of a surface"""
 
         # draw hover and shine circles
-        self.hover_shine(self.pos)
+        self.hover_shine(pos, surface)
 
         # draw button circle
-        pygame.draw.circle(self.layer.surface, self.color,
-                           self.pos, self.size)
-
-        # draw text on layer
-        label = self.font.render(self.text, True,
-                                 self.color)
-        pos = g_f.add_vectors(self.pos, (self.size * 2, 0))
-        label_pos = label.get_rect(midleft=pos)
-        self.layer.surface.blit(label, label_pos)
+        color = self.fill_color()
+        pygame.draw.circle(surface, color, pos, self.size)
+
+        # draw text on surface
+        label = self.render_text(self.text, color)
+        label_pos = label.get_rect(midleft=(pos[0] + self.size * 2, pos[1]))
+        surface.blit(label, label_pos)
+
+    def sprite(self):
+        """returns the pre-rendered sprite of the button's
+        current look, shared by buttons looking the same"""
+
+        rect = self.local_bounds()
+        key = (type(self).paint, self.font, self.text, tuple(self.color),
+               self.size, self.look())
+
+        def paint(surface):
+            self.paint(surface, (-rect.x, -rect.y))
+
+        return self.layer.g_u_i.sprite_cache.get(key, rect.size, paint)
+
+    def redraw(self):
+        """draw circle on layer"""
+
+        # the passing sizes of a resize are not worth caching
+        if self.layer.g_u_i.animator.is_animating(self, "size"):
+            self.paint(self.layer.surface,
+                       (int(self.pos[0]), int(self.pos[1])))
+        else:
+            self.layer.surface.blit(self.sprite(), self.bounds())
 
     def tick_event(self, cur_pos):
         """react to window tick event"""
 
-        # change shine status
-        if self.shine > 0:
-            self.shine -= 1
-            self.layer.to_draw = True
-
         # change hover status when cursor inside
         # or outside button
         if g_f.distance_2d(cur_pos, self.pos) < self.size:
             if not self.hover:
                 self.hover = True
-                self.layer.to_draw = True
+                self.invalidate()
         else:
             if self.hover:
                 self.hover = False
-                self.layer.to_draw = True
+                self.invalidate()
 
 
 class InputButton(Button):
     """button with radio size toggle function, middle deactivation,
     and right action with arguments"""
 
+    __slots__ = ("radio", "on", "activated", "base_size")
+
     def __init__(self, layer, color, pos, size, text,
                  left=EMP, middle=EMP, right=EMP):
 
@@ -299,35 +1095,54 @@ class InputButton(Button):
         self.on = False
         self.activated = True
 
-        # if active, switch its on state
-        def l_action():
-            if self.activated:
-                if self.on:
-                    self.turn_off()
-                else:
-                    self.turn_on()
-                self.layer.to_draw = True
-            call(left)
-
-        # switch activation state
-        def m_action():
-            if self.activated:
-                self.deactivate()
-            else:
-                self.activate()
-            self.layer.to_draw = True
-            call(middle)
-
         # call button constructor
         super().__init__(layer, color, pos, size, text,
-                         (l_action, ()), (m_action, ()), right)
+                         left, middle, right)
+
+        # size when off, grown by a quarter when on
+        self.base_size = size
+
+    @property
+    def size(self):
+        """radius of the button"""
+
+        return self._size
+
+    @size.setter
+    def size(self, size):
+        Button.size.fset(self, size)
+
+        # a size set by the program becomes the new off or on size
+        if not self.layer.g_u_i.animator.is_animating(self, "size"):
+            self.base_size = size * 4/5 if self.on else size
+
+    def left_action(self):
+        """if active, switch its on state"""
+
+        if self.activated:
+            if self.on:
+                self.turn_off()
+            else:
+                self.turn_on()
+            self.invalidate()
+        self.run_action(self.left)
+
+    def middle_action(self):
+        """switch activation state"""
+
+        if self.activated:
+            self.deactivate()
+        else:
+            self.activate()
+        self.invalidate()
+        self.run_action(self.middle)
 
     def turn_on(self):
         """switch mode to on and others' to off"""
 
         if not self.on:
             self.on = True
-            self.size *= 5/4
+            self.tween("size", self.base_size * 5/4, RESIZE_DURATION)
 
             for button in self.radio:
                 if button is not self:
@@ -338,7 +1153,7 @@ class InputButton(Button):
 
         if self.on:
             self.on = False
-            self.size *= 4/5
+            self.tween("size", self.base_size, RESIZE_DURATION)
 
     def activate(self):
         """activates button"""
@@ -353,48 +1168,37 @@ class InputButton(Button):
             self.activated = False
             self.turn_off()
 
-    def redraw(self):
-        """draw self with text in color if active
-        or grey otherwise"""
+    def fill_color(self):
+        """color if active or grey otherwise"""
 
-        # draw hover and shine circles
-        self.hover_shine(self.pos)
-
-        # draw button and create label for text
         if self.activated:
-            color = self.color
-        else:
-            color = GREY
-        pygame.draw.circle(self.layer.surface, color,
-                           self.pos, self.size)
-        label = self.font.render(self.text, True, color)
-
-        # draw text on layer
-        pos = g_f.add_vectors(self.pos, (self.size * 2, 0))
-        label_pos = label.get_rect(midleft=pos)
-        self.layer.surface.blit(label, label_pos)
+            return self.color
+        return GREY
 
 
 class ToggleButton(Button):
     """button with color toggle function"""
 
+    __slots__ = ("on",)
+
     def __init__(self, layer, color, pos, size, text,
                  left=EMP, middle=EMP, right=EMP):
 
         self.on = True
 
-        # if active, switch its on state
-        def l_action():
-            if self.on:
-                self.turn_off()
-            else:
-                self.turn_on()
-            self.layer.to_draw = True
-            call(left)
-
         # call button constructor
         super().__init__(layer, color, pos, size, text,
-                         (l_action, ()), middle, right)
+                         left, middle, right)
+
+    def left_action(self):
+        """switch its on state"""
+
+        if self.on:
+            self.turn_off()
+        else:
+            self.turn_on()
+        self.invalidate()
+        self.run_action(self.left)
 
     def turn_on(self):
         """switch mode to on and others' to off"""
@@ -408,37 +1212,40 @@ class ToggleButton(Button):
         if self.on:
             self.on = False
 
-    def redraw(self):
-        """draw self with text in color if active
-        or grey otherwise"""
+    def fill_color(self):
+        """color if on or grey otherwise"""
+
+        if self.on:
+            return self.color
+        return GREY
+
+    def paint(self, surface, pos):
+        """draws the button with its hover circle
+        above the shine circle"""
 
         # draw hover and shine circles
-        self.hover_shine(self.pos)
+        self.hover_shine(pos, surface)
 
         # draw hover circle if hovering
         if self.hover:
-            pygame.draw.circle(self.layer.surface,
-                               a_f.inv_rgb(self.color),
-                               self.pos, self.size*1.2)
+            pygame.draw.circle(surface, a_f.inv_rgb(self.color),
+                               pos, self.size*1.2)
 
         # draw button and create label for text
-        if self.on:
-            color = self.color
-        else:
-            color = GREY
-        pygame.draw.circle(self.layer.surface, color,
-                           self.pos, self.size)
-        label = self.font.render(self.text, True, color)
-
-        # draw text on layer
-        pos = g_f.add_vectors(self.pos, (self.size * 2, 0))
-        label_pos = label.get_rect(midleft=pos)
-        self.layer.surface.blit(label, label_pos)
+        color = self.fill_color()
+        pygame.draw.circle(surface, color, pos, self.size)
+        label = self.render_text(self.text, color)
+
+        # draw text on surface
+        label_pos = label.get_rect(midleft=(pos[0] + self.size * 2, pos[1]))
+        surface.blit(label, label_pos)
 
 
 class SettingInputButton(InputButton):
     """input button that saves state to settings"""
 
+    __slots__ = ("setting",)
+
     def __init__(self, layer, color, pos, size, text, setting,
                  left=EMP, middle=EMP, right=EMP):
         super().__init__(layer, color, pos, size,
@@ -454,6 +1261,7 @@ class SettingInputButton(InputButton):
                 "on": False,
                 "activated": True
             }
+            self.layer.g_u_i.setting_changed(self.setting)
         if settings[self.setting]["on"]:
             self.turn_on()
         if not settings[self.setting]["activated"]:
@@ -462,46 +1270,41 @@ class SettingInputButton(InputButton):
     def turn_on(self):
         """switch mode to on and others' to off"""
 
-        if not self.on:
-            self.on = True
-            self.size *= 5/4
-
-            for button in self.radio:
-                if button is not self:
-                    button.turn_off()
+        super().turn_on()
 
         self.layer.g_u_i.settings[self.setting]["on"] = self.on
+        self.layer.g_u_i.setting_changed(self.setting)
 
     def turn_off(self):
         """switch mode to off"""
 
-        if self.on:
-            self.on = False
-            self.size *= 4/5
+        super().turn_off()
 
         self.layer.g_u_i.settings[self.setting]["on"] = self.on
+        self.layer.g_u_i.setting_changed(self.setting)
 
     def activate(self):
         """activates button"""
 
-        if not self.activated:
-            self.activated = True
+        super().activate()
 
         self.layer.g_u_i.settings[self.setting]["activated"] = self.activated
+        self.layer.g_u_i.setting_changed(self.setting)
 
     def deactivate(self):
         """activates button"""
 
-        if self.activated:
-            self.activated = False
-            self.turn_off()
+        super().deactivate()
 
         self.layer.g_u_i.settings[self.setting]["activated"] = self.activated
+        self.layer.g_u_i.setting_changed(self.setting)
 
 
 class SettingToggleButton(ToggleButton):
     """toggle button that saves state to settings"""
 
+    __slots__ = ("setting",)
+
     def __init__(self, layer, color, pos, size, text, setting,
                  left=EMP, middle=EMP, right=EMP):
         super().__init__(layer, color, pos, size,
@@ -516,6 +1319,7 @@ class SettingToggleButton(ToggleButton):
             settings[self.setting] = {
                 "on": True,
             }
+            self.layer.g_u_i.setting_changed(self.setting)
         if not settings[self.setting]["on"]:
             self.turn_off()
 
@@ -526,6 +1330,7 @@ class SettingToggleButton(ToggleButton):
             self.on = True
 
         self.layer.g_u_i.settings[self.setting]["on"] = self.on
+        self.layer.g_u_i.setting_changed(self.setting)
 
     def turn_off(self):
         """switch mode to off"""
@@ -534,11 +1339,14 @@ class SettingToggleButton(ToggleButton):
             self.on = False
 
         self.layer.g_u_i.settings[self.setting]["on"] = self.on
+        self.layer.g_u_i.setting_changed(self.setting)
 
 
 class DragAndDrop(Button):
     """Object that can be dragged around"""
 
+    __slots__ = ("initial_cur_pos", "initial_pos", "dragged")
+
     def __init__(self, layer, color, pos, size, text):
 
         # store position
@@ -549,34 +1357,63 @@ class DragAndDrop(Button):
         self.initial_pos = None
         self.dragged = False
 
+    def needs_tick(self):
+        """keep ticking while dragged"""
+
+        return super().needs_tick() or self.dragged
+
     def mouse_button_down(self, event, cur_pos):
         """reacts to mouse button down event"""
 
-        super().mouse_button_down(event, cur_pos)
+        consumed = super().mouse_button_down(event, cur_pos)
 
-        # start dragging if clicked on
+        # start dragging if clicked on, capturing the pointer
         if event.button == 1:
             if g_f.distance_2d(cur_pos, self.pos) < self.size:
                 self.dragged = True
                 self.initial_cur_pos = cur_pos
                 self.initial_pos = self.pos
+                self.layer.g_u_i.capture_pointer(self)
+
+                # keep shining during the drag
+                self.layer.g_u_i.animator.cancel(self, "shine")
+                self.shine = SHINE
+
+        return consumed
 
     def mouse_button_up(self, event, cur_pos):
         """react to mouse button up event"""
 
         super().mouse_button_up(event, cur_pos)
 
-        # stop dragging if click released
-        if event.button == 1:
+        # stop dragging if click released, fading the shine
+        if event.button == 1 and self.dragged:
+            self.drag_to(cur_pos)
             self.dragged = False
+            self.layer.g_u_i.release_pointer()
+            self.tween("shine", 0, SHINE_DURATION)
+
+    def mouse_motion(self, event, cur_pos):
+        """follows the pointer as soon as it moves during a drag"""
+
+        if self.dragged:
+            self.drag_to(cur_pos)
+            return True
+        return False
+
+    def drag_to(self, cur_pos):
+        """moves the object with the cursor, only its
+        previous and new areas being redrawn"""
+
+        cur_diff = g_f.sub_vectors(cur_pos, self.initial_cur_pos)
+        self.pos = g_f.add_vectors(self.initial_pos, cur_diff)
 
     def tick_event(self, cur_pos):
         """react to tick event"""
 
         super().tick_event(cur_pos)
 
-        # update position and shine during drag
-        if self.dragged:
-            self.shine = 5
-            cur_diff = g_f.sub_vectors(cur_pos, self.initial_cur_pos)
-            self.pos = g_f.add_vectors(self.initial_pos, cur_diff)
+        # update position during drag, unless following
+        # the pointer's motion directly
+        if self.dragged and self.layer.g_u_i.capture is not self:
+            self.drag_to(cur_pos)
@@ -0,0 +1,121 @@
+from collections import deque
+import contextlib
+import json
+import os
+import threading
+import time
+
+from pygui.layer import Layer
+
+# span used when profiling is disabled
+NULL_SPAN = contextlib.nullcontext()
+
+
+def span(g_u_i, name):
+    """times a phase of the frame if profiling is enabled"""
+
+    profiler = g_u_i.profiler
+    if profiler is None:
+        return NULL_SPAN
+    return profiler.span(name)
+
+
+class Span:
+    """context timing a named span for a profiler"""
+
+    def __init__(self, profiler, name, category):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.end(self.name, self.start, self.category)
+
+
+class Profiler:
+    """records the durations of the frame phases and of the
+    objects' redraws and callbacks, as Chrome trace events"""
+
+    def __init__(self, max_events=200000):
+
+        # trace events, the oldest being dropped first
+        self.events = deque(maxlen=max_events)
+
+        # duration of each phase in the last frame it ran
+        self.phases = {}
+
+        # origin of the trace timestamps
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+
+    def span(self, name, category="phase"):
+        """returns a context timing a span"""
+
+        return Span(self, name, category)
+
+    def begin(self):
+        """returns the start time of a span"""
+
+        return time.perf_counter()
+
+    def end(self, name, start, category="object"):
+        """records a span started at a time"""
+
+        end = time.perf_counter()
+        self.events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self.origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": self.pid,
+            "tid": threading.get_ident()
+        })
+        if category == "phase":
+            self.phases[name] = end - start
+
+    def export(self, file_name):
+        """writes the recorded spans in Chrome trace event
+        format, viewable in chrome://tracing or Perfetto"""
+
+        with open(file_name, "w") as file:
+            json.dump({"traceEvents": list(self.events),
+                       "displayTimeUnit": "ms"}, file)
+
+    def clear(self):
+        """removes the recorded spans"""
+
+        self.events.clear()
+        self.phases.clear()
+
+
+class ProfilerHUD(Layer):
+    """layer showing the durations of the last frame's phases"""
+
+    def __init__(self, g_u_i, size, color=(255, 255, 0),
+                 text_pos=(10, 10), refresh_rate=4, pos=(0, 0)):
+        super().__init__(g_u_i, size, refresh_rate, pos)
+
+        # text color and position of the first line in the layer
+        self.color = color
+        self.text_pos = text_pos
+
+    def redraw(self):
+        """draws a line per phase with its duration"""
+
+        profiler = self.g_u_i.profiler
+        if profiler is None or self.font is None:
+            return
+
+        line_height = self.font.get_linesize()
+        x, y = self.text_pos
+        for name, duration in sorted(profiler.phases.items()):
+            text = "{:<20} {:6.2f} ms".format(name, 1000 * duration)
+            label = self.font.render(text, True, self.color)
+            self.surface.blit(label, (x, y))
+            y += line_height
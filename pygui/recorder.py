@@ -0,0 +1,168 @@
+import marshal
+import struct
+import threading
+import time
+
+import pygame
+
+from pygui import input_manager
+from pygui.frame_scheduler import FrameScheduler
+
+# start of the log files and their format version
+MAGIC = b"PYGUIREC"
+VERSION = 2
+
+# versions of the logs that can be read, the first one having
+# no late events
+READ_VERSIONS = (1, 2)
+
+# version and frames per second of the recorded window
+HEADER = struct.Struct("<Hd")
+
+"""time since the first frame, flags, cursor position
+and size of the frame's marshalled events"""
+FRAME = struct.Struct("<dBiiI")
+
+"""flags of frames rendered, and of records holding the late
+events of the previous frame, the pointer motion given to the
+captured object just before the frame was drawn"""
+RENDER = 1
+LATE = 2
+
+
+def event_data(event):
+    """type and attributes of an event, without the
+    attributes that cannot be stored"""
+
+    attributes = event.dict
+    try:
+        marshal.dumps(attributes)
+    except ValueError:
+        attributes = {}
+        for key, value in event.dict.items():
+            try:
+                marshal.dumps(value)
+            except ValueError:
+                continue
+            attributes[key] = value
+    return event.type, attributes
+
+
+class Recorder:
+    """writes the events delivered to the layers and the
+    cursor position of each frame to a binary log"""
+
+    def __init__(self, file_name, fps):
+
+        # log file, written through a buffer
+        self.file = open(file_name, "wb")
+        self.file.write(MAGIC)
+        self.file.write(HEADER.pack(VERSION, fps))
+
+        # time of the first recorded frame
+        self.start = None
+
+        # taken to write, as recording may be stopped by any thread
+        self.lock = threading.Lock()
+
+    def record(self, now, cur_pos, events, render=True):
+        """writes a frame, frames without events only
+        taking their header"""
+
+        self.write(now, cur_pos, events, RENDER if render else 0)
+
+    def record_late(self, now, cur_pos, events):
+        """writes the late events of the current frame"""
+
+        self.write(now, cur_pos, events, LATE)
+
+    def write(self, now, cur_pos, events, flags):
+        """writes a frame record"""
+
+        if self.start is None:
+            self.start = now
+
+        payload = b""
+        if events:
+            payload = marshal.dumps([event_data(event) for event in events])
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.write(FRAME.pack(now - self.start, flags,
+                                       int(cur_pos[0]), int(cur_pos[1]),
+                                       len(payload)))
+            self.file.write(payload)
+
+    def close(self):
+        """writes the end of the log"""
+
+        with self.lock:
+            self.file.close()
+
+
+def read_log(file_name):
+    """returns the frames per second of a log and its frames
+    as (time, render, cursor position, events, late events)
+    tuples"""
+
+    with open(file_name, "rb") as file:
+        data = file.read()
+
+    if not data.startswith(MAGIC):
+        raise ValueError(file_name + " is not an input log")
+    offset = len(MAGIC)
+    version, fps = HEADER.unpack_from(data, offset)
+    if version not in READ_VERSIONS:
+        raise ValueError("unsupported input log version "
+                         + str(version))
+    offset += HEADER.size
+
+    frames = []
+    while offset < len(data):
+        frame_time, flags, x, y, size = FRAME.unpack_from(data, offset)
+        offset += FRAME.size
+        events = []
+        if size:
+            events = [pygame.event.Event(event_type, attributes)
+                      for event_type, attributes
+                      in marshal.loads(data[offset:offset + size])]
+            offset += size
+
+        # late events belong to the frame before them
+        if flags & LATE and frames:
+            frames[-1][4].extend(events)
+        else:
+            frames.append((frame_time, bool(flags & RENDER), (x, y),
+                           events, []))
+    return fps, frames
+
+
+def replay(g_u_i, file_name, real_time=False):
+    """feeds a log to a GUI, as fast as possible on the recorded
+    frame times, such that runs are deterministic, or in real
+    time, returns the frame time statistics of the run"""
+
+    fps, frames = read_log(file_name)
+    stats = FrameScheduler(fps, window=max(1, len(frames)))
+
+    start_time = g_u_i.frame_time
+    start_clock = time.monotonic()
+    for frame_time, render, cur_pos, events, late_events in frames:
+
+        # in real time, wait until the frame was recorded
+        if real_time:
+            delay = start_clock + frame_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            now = None
+        else:
+            now = start_time + frame_time
+
+        start = time.perf_counter()
+        g_u_i.cursor = cur_pos
+        running = input_manager.frame(g_u_i, events, render, now,
+                                      cur_pos, late_events=late_events)
+        stats.record_frame(time.perf_counter() - start)
+        if not running:
+            break
+    return stats.stats()
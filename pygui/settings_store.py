@@ -0,0 +1,147 @@
+import copy
+import json
+import os
+import threading
+
+
+def write_atomic(file_name, settings):
+    """writes settings to a temporary file then renames it,
+    such that the file is never left half-written"""
+
+    temp_file_name = file_name + ".tmp"
+    with open(temp_file_name, "w") as file:
+        json.dump(settings, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_file_name, file_name)
+
+
+class SettingsStore:
+    """saves changed settings in a background thread, batching
+    the changes made within a delay, either by appending them
+    to a journal or by rewriting the settings file"""
+
+    def __init__(self, file_name, delay=0.5, journal=True,
+                 max_journal_entries=1000):
+
+        # settings file and journal of changes since its last write
+        self.file_name = file_name
+        self.journal_name = file_name + ".journal"
+        self.journal = journal
+        self.max_journal_entries = max_journal_entries
+        self.journal_entries = 0
+
+        # time waited to batch changes before writing them
+        self.delay = delay
+
+        # copies of the changed settings, by key, waiting to be written
+        self.dirty = {}
+        self.lock = threading.Lock()
+        self.changed = threading.Event()
+
+        # copy of the settings as written, owned by the writer
+        self.saved = {}
+
+        # background writer
+        self.thread = None
+        self.stopping = threading.Event()
+
+    def load(self, default_settings):
+        """loads the settings file, replaying and compacting
+        its journal, or creates it with default settings"""
+
+        created = not os.path.exists(self.file_name)
+        if created:
+            settings = default_settings
+        else:
+            with open(self.file_name, "r") as file:
+                settings = json.load(file)
+
+        # replay the changes journaled after the last write, a
+        # crash during an append can only corrupt the last line
+        journaled = os.path.exists(self.journal_name)
+        if journaled:
+            with open(self.journal_name, "r") as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    settings[entry["key"]] = entry["value"]
+
+        # compact the journal into the settings file, which is
+        # left untouched when there is nothing to add to it
+        if created or journaled:
+            write_atomic(self.file_name, settings)
+        if journaled:
+            os.remove(self.journal_name)
+
+        self.saved = copy.deepcopy(settings)
+        return settings
+
+    def mark_dirty(self, key, value):
+        """registers the new value of a setting to be written"""
+
+        with self.lock:
+            self.dirty[key] = copy.deepcopy(value)
+
+        # start the writer on the first change
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+        self.changed.set()
+
+    def run(self):
+        """writes batches of changes until closed"""
+
+        while not self.stopping.is_set():
+            self.changed.wait()
+
+            # wait for the following changes to batch them
+            self.stopping.wait(self.delay)
+            self.changed.clear()
+            self.flush()
+
+    def flush(self):
+        """writes the pending changes"""
+
+        with self.lock:
+            dirty = self.dirty
+            self.dirty = {}
+        if not dirty:
+            return
+        self.saved.update(dirty)
+
+        # append the changes to the journal, or compact it
+        # into the settings file once it gets too long
+        if self.journal and self.journal_entries < self.max_journal_entries:
+            with open(self.journal_name, "a") as file:
+                for key, value in dirty.items():
+                    file.write(json.dumps({"key": key, "value": value}))
+                    file.write("\n")
+                file.flush()
+                os.fsync(file.fileno())
+            self.journal_entries += len(dirty)
+        else:
+            self.compact()
+
+    def compact(self):
+        """rewrites the settings file and clears the journal"""
+
+        write_atomic(self.file_name, self.saved)
+        if os.path.exists(self.journal_name):
+            os.remove(self.journal_name)
+        self.journal_entries = 0
+
+    def close(self, settings):
+        """stops the writer and writes the complete settings"""
+
+        self.stopping.set()
+        self.changed.set()
+        if self.thread is not None:
+            self.thread.join()
+
+        with self.lock:
+            self.dirty = {}
+        self.saved = copy.deepcopy(settings)
+        self.compact()
@@ -0,0 +1,84 @@
+import pygame
+
+
+class SpatialGrid:
+    """uniform grid storing layer objects in the cells
+    covered by their bounding rect, for fast hit-testing"""
+
+    def __init__(self, cell_size=64):
+
+        # side length of a grid cell in pixels
+        self.cell_size = cell_size
+
+        # objects stored in each cell
+        self.cells = {}
+
+        # cells and bounding rect stored for each object
+        self.object_cells = {}
+        self.object_rects = {}
+
+    def cells_of(self, rect):
+        """returns the cells covered by a rect"""
+
+        size = self.cell_size
+        x_min = int(rect.left // size)
+        x_max = int((rect.right - 1) // size)
+        y_min = int(rect.top // size)
+        y_max = int((rect.bottom - 1) // size)
+        return [(x, y) for x in range(x_min, x_max + 1)
+                for y in range(y_min, y_max + 1)]
+
+    def insert(self, obj, rect):
+        """adds an object with its bounding rect"""
+
+        cells = self.cells_of(rect)
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(obj)
+        self.object_cells[obj] = cells
+        self.object_rects[obj] = pygame.Rect(rect)
+
+    def remove(self, obj):
+        """removes an object from the grid"""
+
+        for cell in self.object_cells.pop(obj, ()):
+            bucket = self.cells[cell]
+            bucket.discard(obj)
+            if not bucket:
+                del self.cells[cell]
+        self.object_rects.pop(obj, None)
+
+    def move(self, obj, rect):
+        """updates the bounding rect of an object"""
+
+        # only touch the buckets if the covered cells changed
+        cells = self.cells_of(rect)
+        if cells != self.object_cells.get(obj):
+            self.remove(obj)
+            self.insert(obj, rect)
+        else:
+            self.object_rects[obj] = pygame.Rect(rect)
+
+    def query_point(self, pos):
+        """returns the objects whose rect contains a point"""
+
+        size = self.cell_size
+        cell = (int(pos[0] // size), int(pos[1] // size))
+        rects = self.object_rects
+        return {obj for obj in self.cells.get(cell, ())
+                if rects[obj].collidepoint(pos)}
+
+    def query_rect(self, rect):
+        """returns the objects whose rect intersects a rect"""
+
+        found = set()
+        for cell in self.cells_of(rect):
+            found.update(self.cells.get(cell, ()))
+        rects = self.object_rects
+        return {obj for obj in found if rects[obj].colliderect(rect)}
+
+    def clear(self):
+        """removes all objects from the grid"""
+
+        self.cells.clear()
+        self.object_cells.clear()
+        self.object_rects.clear()
@@ -0,0 +1,64 @@
+from collections import OrderedDict
+import threading
+
+import pygame
+
+
+class SpriteCache:
+    """least recently used cache of pre-rendered object sprites,
+    keyed by style and state, such that objects looking the
+    same share the same sprite"""
+
+    def __init__(self, max_size=4096):
+
+        # maximum number of sprites kept
+        self.max_size = max_size
+
+        # rendered sprites, least recently used first
+        self.sprites = OrderedDict()
+
+        # cache statistics
+        self.hits = 0
+        self.misses = 0
+
+        # taken while painting, as layers may render in threads
+        self.lock = threading.RLock()
+
+    def get(self, key, size, paint):
+        """returns the sprite of a key, painting it with
+        paint(surface) on a transparent surface of a size
+        if it is not cached already"""
+
+        with self.lock:
+            sprite = self.sprites.get(key)
+            if sprite is not None:
+                self.hits += 1
+                self.sprites.move_to_end(key)
+                return sprite
+
+            # paint the sprite, in the display's format if there is one
+            self.misses += 1
+            sprite = pygame.Surface(size, pygame.SRCALPHA)
+            paint(sprite)
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert_alpha()
+
+            # evict the least recently used sprite
+            self.sprites[key] = sprite
+            if len(self.sprites) > self.max_size:
+                self.sprites.popitem(last=False)
+            return sprite
+
+    def clear(self):
+        """removes all cached sprites"""
+
+        self.sprites.clear()
+
+    def stats(self):
+        """returns the cache hits, misses and size"""
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.sprites)
+        }
@@ -0,0 +1,35 @@
+import pygame
+
+
+class SurfacePool:
+    """reusable transparent surfaces for temporary drawings,
+    one per size, to avoid allocating them at each frame"""
+
+    def __init__(self, max_sizes=32):
+
+        # maximum number of different sizes kept
+        self.max_sizes = max_sizes
+
+        # pooled surfaces by size
+        self.surfaces = {}
+
+    def get(self, size):
+        """returns a cleared transparent surface of a size,
+        valid until the next request of the same size"""
+
+        size = (int(size[0]), int(size[1]))
+        surface = self.surfaces.get(size)
+        if surface is None:
+            if len(self.surfaces) >= self.max_sizes:
+                self.surfaces.clear()
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            self.surfaces[size] = surface
+        else:
+            surface.fill((0, 0, 0, 0))
+            surface.set_alpha(None)
+        return surface
+
+    def clear(self):
+        """releases all pooled surfaces"""
+
+        self.surfaces.clear()
@@ -0,0 +1,56 @@
+from collections import OrderedDict
+import threading
+
+
+class TextCache:
+    """least recently used cache of rendered text surfaces,
+    shared by the objects of a GUI"""
+
+    def __init__(self, max_size=1024):
+
+        # maximum number of surfaces kept
+        self.max_size = max_size
+
+        # rendered surfaces, least recently used first
+        self.surfaces = OrderedDict()
+
+        # cache statistics
+        self.hits = 0
+        self.misses = 0
+
+        # taken while rendering, as layers may render in threads
+        self.lock = threading.Lock()
+
+    def render(self, font, text, color, antialias=True):
+        """returns the surface of a text, rendering it
+        only if it is not cached already"""
+
+        with self.lock:
+            key = (font, text, tuple(color), antialias, font.get_underline())
+            surface = self.surfaces.get(key)
+            if surface is not None:
+                self.hits += 1
+                self.surfaces.move_to_end(key)
+                return surface
+
+            # render the text and evict the least recently used surface
+            self.misses += 1
+            surface = font.render(text, antialias, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_size:
+                self.surfaces.popitem(last=False)
+            return surface
+
+    def clear(self):
+        """removes all cached surfaces"""
+
+        self.surfaces.clear()
+
+    def stats(self):
+        """returns the cache hits, misses and size"""
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.surfaces)
+        }
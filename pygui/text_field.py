@@ -0,0 +1,335 @@
+from pygui.layer import LayerObject, EMP, GREY
+
+import pygame
+
+
+class TextField(LayerObject):
+    """editable text, on one line or several, typed once the
+    field is clicked on, each line being rendered separately
+    such that an edit only renders the lines it touches"""
+
+    __slots__ = ("rect", "color", "multiline", "lines", "surfaces",
+                 "advances", "line", "column", "top", "change", "enter")
+
+    def __init__(self, layer, rect, color, text="", multiline=False,
+                 change=EMP, enter=EMP):
+        super().__init__(layer)
+
+        # area of the field on the layer and color of its text
+        self.rect = pygame.Rect(rect)
+        self.color = color
+        self.multiline = multiline
+
+        """lines of the text and their rendered surfaces,
+        None until they are shown"""
+        self.lines = text.split("\n") if multiline else [text]
+        self.surfaces = [None] * len(self.lines)
+
+        # advance widths of the characters met, in pixels
+        self.advances = {}
+
+        # cursor line and column, and first line shown
+        self.line = 0
+        self.column = 0
+        self.top = 0
+
+        """actions called after each edit, and on return
+        in one-line fields with the text"""
+        self.change = change
+        self.enter = enter
+
+    def text(self):
+        """the field's text"""
+
+        return "\n".join(self.lines)
+
+    def set_text(self, text):
+        """replaces the field's text"""
+
+        self.lines = text.split("\n") if self.multiline else [text]
+        self.surfaces = [None] * len(self.lines)
+        self.line = min(self.line, len(self.lines) - 1)
+        self.column = min(self.column, len(self.lines[self.line]))
+        self.top = 0
+        self.scroll_to_cursor()
+        self.invalidate()
+
+    def line_height(self):
+        """height of a line in pixels"""
+
+        return self.font.get_linesize()
+
+    def visible_lines(self):
+        """number of lines fitting in the field"""
+
+        return max(1, self.rect.height // self.line_height())
+
+    def advance(self, char):
+        """advance width of a character, measured once"""
+
+        width = self.advances.get(char)
+        if width is None:
+            metrics = self.font.metrics(char)
+            if metrics and metrics[0] is not None:
+                width = metrics[0][4]
+            else:
+                width = self.font.size(char)[0]
+            self.advances[char] = width
+        return width
+
+    def column_x(self, line, column):
+        """horizontal position of a column of a line,
+        relative to the field"""
+
+        return sum(self.advance(char) for char in self.lines[line][:column])
+
+    def column_at(self, line, x):
+        """column of a line closest to a horizontal position"""
+
+        text = self.lines[line]
+        left = 0
+        for column, char in enumerate(text):
+            width = self.advance(char)
+            if x < left + width / 2:
+                return column
+            left += width
+        return len(text)
+
+    def line_rect(self, line):
+        """area of a shown line on the layer"""
+
+        height = self.line_height()
+        rect = pygame.Rect(self.rect.x,
+                           self.rect.y + (line - self.top) * height,
+                           self.rect.width, height)
+        return rect.clip(self.rect)
+
+    def mark_lines(self, first, last=None):
+        """requests the redraw of lines, from a line to
+        the bottom of the field if no last line is given"""
+
+        if self.z_index is None:
+            return
+
+        # only the shown lines are redrawn
+        first = max(first, self.top)
+        if last is not None:
+            last = min(last, self.top + self.visible_lines() - 1)
+            if last < first:
+                return
+
+        rect = self.line_rect(first)
+        if last is None:
+            rect.height = self.rect.bottom - rect.top
+        else:
+            rect.union_ip(self.line_rect(last))
+        if rect.width > 0 and rect.height > 0:
+            self.layer.mark_dirty(rect)
+
+    def relayout(self, line):
+        """renders an edited line again"""
+
+        self.surfaces[line] = None
+        self.mark_lines(line, line)
+
+    def scroll_to_cursor(self):
+        """scrolls the field such that the cursor is shown"""
+
+        top = self.top
+        if self.line < top:
+            top = self.line
+        elif self.line >= top + self.visible_lines():
+            top = self.line - self.visible_lines() + 1
+        if top != self.top:
+            self.top = top
+            self.invalidate()
+
+    def move_cursor(self, line, column):
+        """moves the cursor, redrawing the lines it leaves and
+        reaches"""
+
+        previous = self.line
+        self.line = line
+        self.column = column
+        self.mark_lines(previous, previous)
+        self.mark_lines(line, line)
+        self.scroll_to_cursor()
+
+    def insert(self, text):
+        """inserts text at the cursor"""
+
+        if not self.multiline:
+            text = text.replace("\n", " ")
+        new_lines = text.split("\n")
+
+        current = self.lines[self.line]
+        before, after = current[:self.column], current[self.column:]
+
+        # text without line breaks only changes the cursor's line
+        if len(new_lines) == 1:
+            self.lines[self.line] = before + text + after
+            self.relayout(self.line)
+            self.move_cursor(self.line, self.column + len(text))
+        else:
+            new_lines[0] = before + new_lines[0]
+            column = len(new_lines[-1])
+            new_lines[-1] += after
+            line = self.line
+            self.lines[line:line + 1] = new_lines
+            self.surfaces[line:line + 1] = [None] * len(new_lines)
+            self.mark_lines(line)
+            self.move_cursor(line + len(new_lines) - 1, column)
+        self.run_action(self.change)
+
+    def delete_back(self):
+        """deletes the character before the cursor,
+        joining lines at the start of a line"""
+
+        line, column = self.line, self.column
+        if column > 0:
+            text = self.lines[line]
+            self.lines[line] = text[:column - 1] + text[column:]
+            self.relayout(line)
+            self.move_cursor(line, column - 1)
+        elif line > 0:
+            column = len(self.lines[line - 1])
+            self.lines[line - 1] += self.lines.pop(line)
+            del self.surfaces[line]
+            self.surfaces[line - 1] = None
+            self.mark_lines(line - 1)
+            self.move_cursor(line - 1, column)
+        else:
+            return
+        self.run_action(self.change)
+
+    def delete_forward(self):
+        """deletes the character after the cursor,
+        joining lines at the end of a line"""
+
+        line, column = self.line, self.column
+        text = self.lines[line]
+        if column < len(text):
+            self.lines[line] = text[:column] + text[column + 1:]
+            self.relayout(line)
+        elif line + 1 < len(self.lines):
+            self.lines[line] += self.lines.pop(line + 1)
+            del self.surfaces[line + 1]
+            self.surfaces[line] = None
+            self.mark_lines(line)
+        else:
+            return
+        self.run_action(self.change)
+
+    def bounds(self):
+        """rect of the field"""
+
+        return self.rect
+
+    def focused(self):
+        """whether the field receives the keyboard input"""
+
+        return self.layer.g_u_i.focus is self
+
+    def mouse_button_down(self, event, cur_pos):
+        """takes the keyboard focus and moves the cursor
+        to the clicked position"""
+
+        if event.button != 1 or not self.rect.collidepoint(cur_pos):
+            return False
+
+        self.layer.g_u_i.set_focus(self)
+        line = self.top + (cur_pos[1] - self.rect.top) // self.line_height()
+        line = min(line, len(self.lines) - 1)
+        self.move_cursor(line, self.column_at(line, cur_pos[0]
+                                              - self.rect.left))
+        return True
+
+    def text_input(self, event, cur_pos):
+        """inserts typed text"""
+
+        if not self.focused():
+            return False
+        self.insert(event.text)
+        return True
+
+    def key_down(self, event, cur_pos):
+        """edits the text and moves the cursor with the
+        editing keys, other keys being typed as text input"""
+
+        if not self.focused():
+            return False
+
+        line, column = self.line, self.column
+        key = event.key
+        if key == pygame.K_BACKSPACE:
+            self.delete_back()
+        elif key == pygame.K_DELETE:
+            self.delete_forward()
+        elif key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+            if self.multiline:
+                self.insert("\n")
+            else:
+                self.run_action((self.enter[0],
+                                 self.enter[1] + (self.text(),)))
+        elif key == pygame.K_LEFT:
+            if column > 0:
+                self.move_cursor(line, column - 1)
+            elif line > 0:
+                self.move_cursor(line - 1, len(self.lines[line - 1]))
+        elif key == pygame.K_RIGHT:
+            if column < len(self.lines[line]):
+                self.move_cursor(line, column + 1)
+            elif line + 1 < len(self.lines):
+                self.move_cursor(line + 1, 0)
+        elif key in (pygame.K_UP, pygame.K_DOWN):
+            target = line - 1 if key == pygame.K_UP else line + 1
+            if 0 <= target < len(self.lines):
+                x = self.column_x(line, column)
+                self.move_cursor(target, self.column_at(target, x))
+        elif key == pygame.K_HOME:
+            self.move_cursor(line, 0)
+        elif key == pygame.K_END:
+            self.move_cursor(line, len(self.lines[line]))
+        elif key == pygame.K_ESCAPE:
+            self.layer.g_u_i.set_focus(None)
+
+        # keys typing text are consumed, their text coming
+        # as text input
+        else:
+            return event.unicode.isprintable() and event.unicode != ""
+        return True
+
+    def line_surface(self, line):
+        """rendered line, rendering it if it changed"""
+
+        surface = self.surfaces[line]
+        if surface is None:
+            surface = self.font.render(self.lines[line], True, self.color)
+            self.surfaces[line] = surface
+        return surface
+
+    def redraw(self):
+        """draws the shown lines inside the layer's clip,
+        the cursor and the field's border"""
+
+        surface = self.layer.surface
+        clip = surface.get_clip()
+        surface.set_clip(clip.clip(self.rect))
+
+        height = self.line_height()
+        first = self.top + max(0, (clip.top - self.rect.top) // height)
+        last = min(len(self.lines), self.top + self.visible_lines(),
+                   self.top + (clip.bottom - self.rect.top - 1) // height + 1)
+        for line in range(first, last):
+            surface.blit(self.line_surface(line), self.line_rect(line))
+
+        # draw the cursor if typing in the field
+        if self.focused() and first <= self.line < last:
+            rect = self.line_rect(self.line)
+            x = rect.left + self.column_x(self.line, self.column)
+            pygame.draw.line(surface, self.color, (x, rect.top),
+                             (x, rect.bottom - 1))
+
+        surface.set_clip(clip)
+        color = self.color if self.focused() else GREY
+        pygame.draw.rect(surface, color, self.rect, 1)
@@ -0,0 +1,176 @@
+from collections import OrderedDict
+
+from pygui.layer import LayerObject, EMP, TRANSPARENT
+
+import pygame
+
+
+class VirtualList(LayerObject):
+    """scrollable list of text rows pulled from a data source,
+    only the visible rows being rendered, scrolled by shifting
+    the already drawn rows"""
+
+    __slots__ = ("rect", "row_count", "get_row", "color", "row_height",
+                 "overscan", "offset", "surface", "rows", "cache_size",
+                 "left")
+
+    def __init__(self, layer, rect, row_count, get_row, color,
+                 row_height=None, overscan=3, cache_size=512, left=EMP):
+        super().__init__(layer)
+
+        # area of the list on the layer
+        self.rect = pygame.Rect(rect)
+
+        """number of rows (or function returning it) and
+        function returning the text of a row by index"""
+        self.row_count = row_count
+        self.get_row = get_row
+
+        # text color and height of rows
+        self.color = color
+        if row_height is None:
+            row_height = self.font.get_linesize()
+        self.row_height = row_height
+
+        # rows rendered in advance above and below the view
+        self.overscan = overscan
+
+        # scroll offset in pixels
+        self.offset = 0
+
+        # visible rows drawn at the current offset
+        self.surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+
+        # rendered rows by index with their text, least recent first
+        self.rows = OrderedDict()
+        self.cache_size = cache_size
+
+        """left click action, called with the
+        index of the clicked row"""
+        self.left = left
+
+        self.render_band(0, self.rect.height)
+
+    def count(self):
+        """number of rows in the data source"""
+
+        if callable(self.row_count):
+            return self.row_count()
+        return self.row_count
+
+    def max_offset(self):
+        """largest scroll offset showing the last row"""
+
+        return max(0, self.count() * self.row_height - self.rect.height)
+
+    def row_surface(self, index):
+        """rendered row, from the cache if its text did not change"""
+
+        text = self.get_row(index)
+        cached = self.rows.get(index)
+        if cached is not None and cached[0] == text:
+            self.rows.move_to_end(index)
+            return cached[1]
+
+        # rendered directly, the rows having their own cache
+        surface = self.font.render(text, True, self.color)
+        self.rows[index] = (text, surface)
+        if len(self.rows) > self.cache_size:
+            self.rows.popitem(last=False)
+        return surface
+
+    def render_band(self, top, bottom):
+        """redraws the rows crossing a horizontal band
+        of the list's surface"""
+
+        band = pygame.Rect(0, top, self.rect.width, bottom - top)
+        self.surface.set_clip(band)
+        self.surface.fill(TRANSPARENT, band)
+
+        height = self.row_height
+        first = max(0, (self.offset + top) // height)
+        last = min(self.count(), (self.offset + bottom - 1) // height + 1)
+        for index in range(first, last):
+            self.surface.blit(self.row_surface(index),
+                              (0, index * height - self.offset))
+        self.surface.set_clip(None)
+
+        # render the rows next to the view in advance
+        for index in range(max(0, first - self.overscan), first):
+            self.row_surface(index)
+        for index in range(last, min(self.count(), last + self.overscan)):
+            self.row_surface(index)
+
+    def scroll_to(self, offset):
+        """moves the view to a scroll offset, shifting the
+        drawn rows and only rendering the uncovered ones"""
+
+        offset = min(max(0, int(offset)), self.max_offset())
+        shift = self.offset - offset
+        if not shift:
+            return
+        self.offset = offset
+
+        height = self.rect.height
+        if abs(shift) >= height:
+            self.render_band(0, height)
+        else:
+            self.surface.scroll(0, shift)
+            if shift > 0:
+                self.render_band(0, shift)
+            else:
+                self.render_band(height + shift, height)
+        self.invalidate()
+
+    def scroll(self, rows):
+        """scrolls by a number of rows, down if positive"""
+
+        self.scroll_to(self.offset + rows * self.row_height)
+
+    def refresh(self):
+        """redraws the visible rows after the data changed"""
+
+        self.offset = min(self.offset, self.max_offset())
+        self.render_band(0, self.rect.height)
+        self.invalidate()
+
+    def bounds(self):
+        """rect of the list"""
+
+        return self.rect
+
+    def event_types(self):
+        """reacts to mouse wheel and clicks"""
+
+        return frozenset((pygame.MOUSEWHEEL, pygame.MOUSEBUTTONDOWN))
+
+    def event(self, event, cur_pos=None):
+        """scrolls with the mouse wheel over the list"""
+
+        if cur_pos is None:
+            cur_pos = self.layer.event_pos
+
+        if event.type == pygame.MOUSEWHEEL:
+            if self.rect.collidepoint(cur_pos):
+                self.scroll(-3 * event.y)
+                return True
+            return False
+
+        return super().event(event, cur_pos)
+
+    def mouse_button_down(self, event, cur_pos):
+        """calls the left action with the clicked row"""
+
+        if event.button != 1 or not self.rect.collidepoint(cur_pos):
+            return False
+
+        index = (cur_pos[1] - self.rect.top + self.offset) // self.row_height
+        if index >= self.count():
+            return False
+        self.run_action((self.left[0], self.left[1] + (int(index),)))
+        return True
+
+    def redraw(self):
+        """draws the visible rows on the layer"""
+
+        self.layer.surface.blit(self.surface, self.rect)
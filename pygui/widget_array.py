@@ -0,0 +1,169 @@
+from utility_functions import algebraic_functions as a_f
+
+from pygui.layer import LayerObject, EMP, SHINE, SHINE_DURATION
+
+import numpy as np
+import pygame
+
+
+class IndicatorArray(LayerObject):
+    """many circular indicators stored in NumPy arrays as a single
+    layer object, 37 bytes per indicator (16 for its position, 8
+    each for its size and shine end, 3 for its color and 2 for its
+    states), with hover and shine updated in one vectorized pass
+    per tick"""
+
+    __slots__ = ("positions", "sizes", "colors", "hovers", "shines",
+                 "shine_ends", "left")
+
+    def __init__(self, layer, positions, sizes, colors, left=EMP):
+        super().__init__(layer)
+
+        # indicator centers, radii and colors
+        self.positions = np.asarray(positions, dtype=np.float64)
+        count = len(self.positions)
+        self.sizes = np.broadcast_to(
+            np.asarray(sizes, dtype=np.float64), (count,)).copy()
+        self.colors = np.broadcast_to(
+            np.asarray(colors, dtype=np.uint8), (count, 3)).copy()
+
+        # hover and shine states, shines fading until their end time
+        self.hovers = np.zeros(count, dtype=bool)
+        self.shines = np.zeros(count, dtype=np.int8)
+        self.shine_ends = np.zeros(count, dtype=np.float64)
+
+        """left click action, called with the
+        index of the clicked indicator"""
+        self.left = left
+
+    def __len__(self):
+        return len(self.positions)
+
+    def rects(self, indices):
+        """rects covered by the hover circles of indicators"""
+
+        halos = self.sizes[indices] * 1.2 + 1
+        tops_lefts = self.positions[indices] - halos[:, None]
+        return [pygame.Rect(int(x), int(y), int(2 * h) + 2, int(2 * h) + 2)
+                for (x, y), h in zip(tops_lefts, halos)]
+
+    def bounds(self):
+        """rect covering all indicators"""
+
+        if not len(self):
+            return pygame.Rect(0, 0, 0, 0)
+        halos = self.sizes * 1.2 + 1
+        left, top = (self.positions - halos[:, None]).min(axis=0)
+        right, bottom = (self.positions + halos[:, None]).max(axis=0)
+        return pygame.Rect(int(left), int(top), int(right - left) + 2,
+                           int(bottom - top) + 2)
+
+    def needs_tick(self):
+        """keep ticking while an indicator is hovered or shining"""
+
+        return bool(self.hovers.any() or self.shines.any())
+
+    def animating(self):
+        """ticks are needed while indicators shine"""
+
+        return bool(self.shines.any())
+
+    def hit(self, cur_pos):
+        """index of the top indicator under the cursor, or None"""
+
+        offsets = self.positions - cur_pos
+        inside = np.nonzero((offsets ** 2).sum(axis=1) < self.sizes ** 2)[0]
+        if not len(inside):
+            return None
+        return int(inside[-1])
+
+    def invalidate_indicators(self, indices):
+        """requests the redraw of indicators"""
+
+        for rect in self.rects(indices):
+            self.layer.mark_dirty(rect)
+
+    def set_color(self, index, color):
+        """changes the color of an indicator"""
+
+        self.colors[index] = color
+        self.invalidate_indicators([index])
+
+    def set_position(self, index, pos):
+        """moves an indicator, only its previous and new
+        areas being redrawn"""
+
+        self.invalidate_indicators([index])
+        self.positions[index] = pos
+        self.invalidate_indicators([index])
+
+        # the array's bounds may have changed, but not the pixels
+        # of the other indicators
+        if self.z_index is not None:
+            self.layer.grid.move(self, self.bounds())
+
+    def tick_event(self, cur_pos):
+        """updates hover and shine of all indicators at once"""
+
+        offsets = self.positions - cur_pos
+        hovers = (offsets ** 2).sum(axis=1) < self.sizes ** 2
+
+        # shine levels fading on wall-clock time
+        remaining = self.shine_ends - self.layer.g_u_i.frame_time
+        shines = np.clip(np.ceil(SHINE * remaining / SHINE_DURATION),
+                         0, SHINE).astype(np.int8)
+
+        # redraw the indicators whose state changed
+        changed = np.nonzero((hovers != self.hovers)
+                             | (shines != self.shines))[0]
+        self.hovers = hovers
+        self.shines = shines
+        if len(changed):
+            self.invalidate_indicators(changed)
+
+    def mouse_button_down(self, event, cur_pos):
+        """calls the left action with the clicked indicator,
+        consuming the click"""
+
+        if event.button != 1:
+            return False
+        index = self.hit(cur_pos)
+        if index is None:
+            return False
+
+        self.shines[index] = SHINE
+        self.shine_ends[index] = self.layer.g_u_i.frame_time + SHINE_DURATION
+        self.invalidate_indicators([index])
+        self.run_action((self.left[0], self.left[1] + (index,)))
+        return True
+
+    def redraw(self):
+        """draws the indicators touching the clip region"""
+
+        surface = self.layer.surface
+        clip = surface.get_clip()
+        halos = self.sizes * 1.2
+        lows = self.positions - halos[:, None]
+        highs = self.positions + halos[:, None]
+        visible = np.nonzero(
+            (highs[:, 0] >= clip.left) & (lows[:, 0] <= clip.right)
+            & (highs[:, 1] >= clip.top) & (lows[:, 1] <= clip.bottom))[0]
+
+        for i in visible:
+            pos = tuple(self.positions[i])
+            color = tuple(int(c) for c in self.colors[i])
+            halo = halos[i]
+
+            # draw hover and shine circles
+            if self.shines[i]:
+                side = int(halo * 2) + 2
+                surf = self.layer.surface_pool.get((side, side))
+                surf.set_alpha(int(255 / self.shines[i]))
+                pygame.draw.circle(surf, a_f.inv_rgb(color),
+                                   (side / 2, side / 2), halo)
+                surface.blit(surf, (pos[0] - side / 2, pos[1] - side / 2))
+            elif self.hovers[i]:
+                pygame.draw.circle(surface, a_f.inv_rgb(color), pos, halo)
+
+            # draw indicator circle
+            pygame.draw.circle(surface, color, pos, self.sizes[i])